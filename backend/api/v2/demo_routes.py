@@ -1,5 +1,6 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Response
 from demo.autoplay_controller import CrisisAutoPlayController
+from demo.crisis_455pm_data import CRISIS_TIMELINE_JSON
 import uuid
 import logging
 import asyncio
@@ -19,7 +20,7 @@ async def start_demo(scenario: str = "crisis_455pm"):
     返回 demo_id 和 WebSocket URL
     """
     demo_id = str(uuid.uuid4())
-    logger.info(f"Starting demo session: {demo_id} for scenario: {scenario}")
+    logger.info("Starting demo session: %s for scenario: %s", demo_id, scenario)
     
     controller = CrisisAutoPlayController()
     active_sessions[demo_id] = controller
@@ -31,17 +32,24 @@ async def start_demo(scenario: str = "crisis_455pm"):
         "duration_seconds": 178
     }
 
+@router.get("/timeline", response_model=None)
+async def get_demo_timeline():
+    """
+    返回完整的Crisis时间线（导入时预序列化）
+    """
+    return Response(content=CRISIS_TIMELINE_JSON, media_type="application/json")
+
 @router.websocket("/ws")
 async def websocket_demo(websocket: WebSocket, demo_id: str):
     """
     WebSocket连接处理
     """
     await websocket.accept()
-    logger.info(f"WebSocket connected for demo_id: {demo_id}")
+    logger.info("WebSocket connected for demo_id: %s", demo_id)
 
     controller = active_sessions.get(demo_id)
     if not controller:
-        logger.warning(f"Demo session not found: {demo_id}")
+        logger.warning("Demo session not found: %s", demo_id)
         await websocket.close(code=1008, reason="Invalid demo_id")
         return
 
@@ -51,7 +59,7 @@ async def websocket_demo(websocket: WebSocket, demo_id: str):
         # Loop to handle commands from client (e.g., "play", "confirm")
         while True:
             data = await websocket.receive_json()
-            logger.info(f"Received command: {data}")
+            logger.info("Received command: %s", data)
             
             if data.get("action") == "play":
                 if not controller.is_playing:
@@ -62,17 +70,17 @@ async def websocket_demo(websocket: WebSocket, demo_id: str):
             elif data.get("action") == "confirm":
                 # 用户确认决策（Approve/Override/Details）
                 confirmation_type = data.get("confirmation_type", "approve")
-                logger.info(f"User confirmed decision: {confirmation_type}")
+                logger.info("User confirmed decision: %s", confirmation_type)
                 controller.confirm_decision(confirmation_type)
             elif data.get("action") == "ping":
                 await websocket.send_json({"type": "pong"})
 
     except WebSocketDisconnect:
-        logger.info(f"WebSocket disconnected: {demo_id}")
+        logger.info("WebSocket disconnected: %s", demo_id)
         if demo_id in active_sessions:
             del active_sessions[demo_id]
     except Exception as e:
-        logger.error(f"WebSocket error: {e}")
+        logger.error("WebSocket error: %s", e)
         try:
             await websocket.close(code=1011)
         except:
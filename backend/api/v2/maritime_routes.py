@@ -325,7 +325,7 @@ class ProvisionResponse(BaseModel):
 
 
 @router.post("/me/provision")
-async def provision_user(
+def provision_user(
     req: ProvisionRequest,
     db: Session = Depends(get_db)
 ):
@@ -392,7 +392,7 @@ async def provision_user(
 # ========== Vessel Management Endpoints ==========
 
 @router.post("/vessels", response_model=VesselResponse, status_code=201)
-async def create_vessel(
+def create_vessel(
     vessel: VesselCreate,
     customer_id: int = Query(..., description="Customer ID"),
     db: Session = Depends(get_db)
@@ -439,7 +439,7 @@ async def create_vessel(
 
 
 @router.get("/vessels", response_model=List[VesselResponse])
-async def list_vessels(
+def list_vessels(
     customer_id: int = Query(..., description="Customer ID"),
     db: Session = Depends(get_db)
 ):
@@ -470,7 +470,7 @@ async def list_vessels(
 
 
 @router.get("/vessels/{vessel_id}", response_model=VesselResponse)
-async def get_vessel(vessel_id: int, db: Session = Depends(get_db)):
+def get_vessel(vessel_id: int, db: Session = Depends(get_db)):
     """Get vessel details"""
     vessel = db.query(Vessel).filter(Vessel.id == vessel_id).first()
     if not vessel:
@@ -499,7 +499,7 @@ async def get_vessel(vessel_id: int, db: Session = Depends(get_db)):
 # ========== Vessel Route Management Endpoints ==========
 
 @router.post("/vessels/{vessel_id}/routes", response_model=VesselRouteResponse, status_code=201)
-async def create_vessel_route(
+def create_vessel_route(
     vessel_id: int,
     route: VesselRouteCreate,
     db: Session = Depends(get_db)
@@ -529,9 +529,7 @@ async def create_vessel_route(
     new_route = VesselRoute(
         vessel_id=vessel_id,
         route_name=route.route_name,
-        port_codes=json.dumps(port_codes),
-        origin_port=port_codes[0] if port_codes else None,
-        destination_port=port_codes[-1] if port_codes else None,
+        port_codes=port_codes,
         departure_date=parsed_departure,
         is_active=route.set_active,
     )
@@ -554,7 +552,7 @@ async def create_vessel_route(
 
 
 @router.get("/vessels/{vessel_id}/routes", response_model=List[VesselRouteResponse])
-async def list_vessel_routes(
+def list_vessel_routes(
     vessel_id: int,
     db: Session = Depends(get_db)
 ):
@@ -570,7 +568,7 @@ async def list_vessel_routes(
             id=r.id,
             vessel_id=r.vessel_id,
             route_name=r.route_name,
-            port_codes=json.loads(r.port_codes) if r.port_codes else [],
+            port_codes=r.port_codes or [],
             origin_port=r.origin_port,
             destination_port=r.destination_port,
             departure_date=r.departure_date,
@@ -582,7 +580,7 @@ async def list_vessel_routes(
 
 
 @router.get("/vessels/{vessel_id}/routes/active", response_model=VesselRouteResponse)
-async def get_active_route(
+def get_active_route(
     vessel_id: int,
     db: Session = Depends(get_db)
 ):
@@ -599,7 +597,7 @@ async def get_active_route(
         id=route.id,
         vessel_id=route.vessel_id,
         route_name=route.route_name,
-        port_codes=json.loads(route.port_codes) if route.port_codes else [],
+        port_codes=route.port_codes or [],
         origin_port=route.origin_port,
         destination_port=route.destination_port,
         departure_date=route.departure_date,
@@ -609,7 +607,7 @@ async def get_active_route(
 
 
 @router.put("/vessels/{vessel_id}/routes/{route_id}/activate", response_model=VesselRouteResponse)
-async def activate_vessel_route(
+def activate_vessel_route(
     vessel_id: int,
     route_id: int,
     db: Session = Depends(get_db)
@@ -638,7 +636,7 @@ async def activate_vessel_route(
         id=route.id,
         vessel_id=route.vessel_id,
         route_name=route.route_name,
-        port_codes=json.loads(route.port_codes) if route.port_codes else [],
+        port_codes=route.port_codes or [],
         origin_port=route.origin_port,
         destination_port=route.destination_port,
         departure_date=route.departure_date,
@@ -648,7 +646,7 @@ async def activate_vessel_route(
 
 
 @router.delete("/vessels/{vessel_id}/routes/{route_id}")
-async def delete_vessel_route(
+def delete_vessel_route(
     vessel_id: int,
     route_id: int,
     db: Session = Depends(get_db)
@@ -1110,7 +1108,7 @@ async def detect_missing_documents(
                 detail="No active route found for this vessel. Please create a route first."
             )
 
-        port_codes = json.loads(route.port_codes) if route.port_codes else []
+        port_codes = route.port_codes or []
         route_name = route.route_name or "Unnamed Route"
 
         # Prepare vessel info
@@ -1446,7 +1444,7 @@ async def check_route_compliance(
 
 
 @router.post("/compliance/check-port")
-async def check_port_compliance(
+def check_port_compliance(
     vessel_id: int = Query(...),
     port_code: str = Query(..., min_length=2),
     db: Session = Depends(get_db)
@@ -1463,7 +1461,7 @@ async def check_port_compliance(
 
 
 @router.get("/compliance/history/{vessel_id}")
-async def get_compliance_history(
+def get_compliance_history(
     vessel_id: int,
     limit: int = Query(default=10, ge=1, le=50),
     db: Session = Depends(get_db)
@@ -1476,7 +1474,7 @@ async def get_compliance_history(
         {
             "id": c.id,
             "route_name": c.route_name,
-            "route_ports": json.loads(c.route_ports) if c.route_ports else [],
+            "route_ports": c.route_ports or [],
             "overall_status": c.overall_status.value if c.overall_status else None,
             "compliance_score": c.compliance_score,
             "created_at": c.created_at.isoformat(),
@@ -1605,7 +1603,7 @@ async def get_knowledge_base_stats():
 # ========== Port Data Endpoints ==========
 
 @router.get("/ports")
-async def list_ports(
+def list_ports(
     region: Optional[str] = None,
     limit: int = Query(default=100, ge=1, le=500),
     db: Session = Depends(get_db)
@@ -1635,7 +1633,7 @@ async def list_ports(
 
 
 @router.get("/ports/{port_code}")
-async def get_port(port_code: str, db: Session = Depends(get_db)):
+def get_port(port_code: str, db: Session = Depends(get_db)):
     """Get port details"""
     port = db.query(Port).filter(Port.un_locode == port_code).first()
 
@@ -1766,7 +1764,7 @@ async def get_route_compliance_summary(
 
 
 @router.post("/reports/compliance-report", response_model=ComplianceReport, summary="Generate full compliance report")
-async def generate_full_compliance_report(
+def generate_full_compliance_report(
     request: StructuredReportRequest,
     db: Session = Depends(get_db)
 ):
@@ -1,22 +1,37 @@
 from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.pool import QueuePool
 from config import get_settings
 
 settings = get_settings()
 
+# 连接池大小等参数只有 QueuePool 接受（如 sqlite:///:memory: 使用 SingletonThreadPool）
+_url = make_url(settings.database_url)
+_pool_kwargs = {}
+if issubclass(_url.get_dialect().get_pool_class(_url), QueuePool):
+    _pool_kwargs = dict(
+        pool_size=settings.database_pool_size,
+        max_overflow=settings.database_max_overflow,
+        pool_use_lifo=settings.database_pool_use_lifo,
+    )
+
 # 创建数据库引擎
 engine = create_engine(
     settings.database_url,
-    pool_pre_ping=True,
-    echo=settings.debug
+    pool_recycle=settings.database_pool_recycle,
+    pool_pre_ping=settings.database_pool_pre_ping,
+    echo=settings.debug if settings.database_echo is None else settings.database_echo,
+    **_pool_kwargs
 )
 
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# 创建Base类
-Base = declarative_base()
+# 创建Base类（SQLAlchemy 2.0 声明式基类）
+class Base(DeclarativeBase):
+    pass
+
 
 def get_db():
     """依赖注入：获取数据库会话"""
@@ -36,7 +36,7 @@ class CrisisAutoPlayController:
 
     def confirm_decision(self, action: str):
         """接收用户的确认决策"""
-        logger.info(f"User confirmation received: {action}")
+        logger.info("User confirmation received: %s", action)
         self.confirmation_action = action
         self.confirmation_event.set()
 
@@ -109,7 +109,7 @@ class CrisisAutoPlayController:
                     "analysis": result.to_dict()
                 })
             except Exception as e:
-                logger.error(f"Visual risk analysis fail in demo: {e}")
+                logger.error("Visual risk analysis fail in demo: %s", e)
                 # Fallback purely handled by service, but if service crashes, we catch here
                 await websocket.send_json({
                     "type": "ERROR",
@@ -330,7 +330,7 @@ class CrisisAutoPlayController:
             })
 
         except Exception as e:
-            logger.error(f"Error in demo sequence: {e}", exc_info=True)
+            logger.error("Error in demo sequence: %s", e, exc_info=True)
             await websocket.send_json({
                 "type": "ERROR",
                 "timestamp": datetime.now().isoformat(),
@@ -1,7 +1,8 @@
 ﻿"""4:55 PM Crisis瀹屾暣Mock鏁版嵁"""
 
-from datetime import datetime, timedelta
-from typing import Dict, List
+from types import MappingProxyType
+
+import orjson
 
 # 瀹屾暣鏃堕棿绾挎暟鎹?
 CRISIS_TIMELINE = {
@@ -125,3 +126,27 @@ CRISIS_TIMELINE = {
         }
     }
 }
+
+# 时间线为只读常量：导入时序列化一次，接口直接返回字节，跳过逐请求的编码
+CRISIS_TIMELINE_JSON: bytes = orjson.dumps(CRISIS_TIMELINE)
+
+
+def _freeze(obj):
+    """递归地将list转为tuple（dict保持不变，WebSocket的send_json需要dict）"""
+    if isinstance(obj, list):
+        return tuple(_freeze(item) for item in obj)
+    if isinstance(obj, dict):
+        return {key: _freeze(value) for key, value in obj.items()}
+    return obj
+
+
+# 冻结时间线：顶层只读视图 + 叶子tuple，可在多个演示会话间共享而无需拷贝
+CRISIS_TIMELINE = MappingProxyType(_freeze(CRISIS_TIMELINE))
+
+# 受影响货物ID集合，用于O(1)成员判断（时间线中保留tuple以便JSON序列化）
+AFFECTED_SHIPMENT_IDS = frozenset(CRISIS_TIMELINE["t1_black_swan"]["affected_shipments"])
+
+# 货物ID -> 货物记录索引，替代对shipments列表的线性扫描
+SHIPMENT_BY_ID = MappingProxyType({
+    shipment["id"]: shipment for shipment in CRISIS_TIMELINE["t0_normal_state"]["shipments"]
+})
@@ -4,12 +4,13 @@ FastAPI主应用
 from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlalchemy.orm import Session, selectinload
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
-from datetime import datetime
+from datetime import datetime, timezone
 import uvicorn
+import asyncio
 import logging
 import hashlib
 import json
@@ -29,6 +30,7 @@ from core.crew_orchestrator import CrewAIOrchestrator, get_crew_orchestrator
 from core.crew_stock_research import build_company_research_crew
 from core.hedge_agent import get_hedge_agent
 from services.market_data_service import get_market_data_service
+from services.maritime_knowledge_base import prewarm_maritime_knowledge_base
 from core.clerk_auth import get_current_user, User
 
 from api.v2.demo_routes import router as demo_router
@@ -48,7 +50,8 @@ Base.metadata.create_all(bind=engine)
 # 创建FastAPI应用
 app = FastAPI(
     title="DJI Sales AI Assistant API",
-    description="大疆无人机智能销售助理系统", version="0.1.0"
+    description="大疆无人机智能销售助理系统", version="0.1.0",
+    default_response_class=ORJSONResponse  # 使用orjson序列化响应，替代标准库json
 )
 
 # region agent log
@@ -162,6 +165,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def prewarm_core_services():
+    """启动时在后台预热知识库，避免首个请求承担初始化开销"""
+    # 保留任务引用，防止被垃圾回收；每个worker进程各预热一次
+    app.state.kb_prewarm_task = asyncio.create_task(prewarm_maritime_knowledge_base())
+
+
 # 初始化核心模块
 try:
     # chatbot = get_chatbot()
@@ -246,7 +256,7 @@ def read_root():
     }
 
 @app.post("/api/chat", response_model=ChatResponse)
-async def chat(
+def chat(
     request: ChatRequest,
     bg_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
@@ -269,7 +279,7 @@ async def chat(
         active_conv = Conversation(
             customer_id=request.customer_id,
             status="active",
-            started_at=datetime.now()
+            started_at=datetime.now(timezone.utc)
         )
         db.add(active_conv)
         db.commit()
@@ -281,7 +291,7 @@ async def chat(
         content=request.message,
         sender=MessageSender.CUSTOMER,
         language=request.language,
-        created_at=datetime.now()
+        created_at=datetime.now(timezone.utc)
     )
     db.add(customer_msg)
     
@@ -312,7 +322,7 @@ async def chat(
         sender=MessageSender.AI,
         language=request.language,
         ai_confidence=response['confidence'],
-        created_at=datetime.now()
+        created_at=datetime.now(timezone.utc)
     )
     db.add(ai_msg)
     
@@ -360,7 +370,7 @@ def create_customer(
         company=customer.company,
         phone=customer.phone,
         language=customer.language,
-        created_at=datetime.now()
+        created_at=datetime.now(timezone.utc)
     )
     db.add(new_customer)
     db.commit()
@@ -400,7 +410,7 @@ def list_customers(
     }
 
 @app.post("/api/classify/{customer_id}")
-async def classify_customer(customer_id: int, db: Session = Depends(get_db)):
+def classify_customer(customer_id: int, db: Session = Depends(get_db)):
     """手动触发客户分类"""
     customer = db.query(Customer).filter(Customer.id == customer_id).first()
     if not customer:
@@ -427,7 +437,7 @@ async def classify_customer(customer_id: int, db: Session = Depends(get_db)):
     customer.category = result['category']
     customer.priority_score = result['priority_score']
     customer.classification_reason = result['reason']
-    customer.updated_at = datetime.now()
+    customer.updated_at = datetime.now(timezone.utc)
     db.commit()
     
     return result
@@ -453,16 +463,16 @@ def create_handoff(request: HandoffRequest, db: Session = Depends(get_db)):
 @app.get("/api/conversations/{customer_id}")
 def get_conversations(customer_id: int, db: Session = Depends(get_db)):
     """获取客户的所有对话"""
-    # 获取客户的所有对话
-    conversations = db.query(Conversation).filter(
+    # 获取客户的所有对话（消息通过selectin一次性批量加载，避免每个对话单独查询）
+    conversations = db.query(Conversation).options(
+        selectinload(Conversation.messages)
+    ).filter(
         Conversation.customer_id == customer_id
     ).order_by(Conversation.started_at.desc()).all()
     
     result = []
     for conversation in conversations:
-        messages = db.query(Message).filter(
-            Message.conversation_id == conversation.id
-        ).order_by(Message.created_at).all()
+        messages = conversation.messages
         
         result.append({
             "id": conversation.id,
@@ -575,7 +585,7 @@ def send_human_message(request: HumanMessageRequest, db: Session = Depends(get_d
         conversation_id=request.conversation_id,
         content=request.content,
         sender=MessageSender.HUMAN,
-        created_at=datetime.now()
+        created_at=datetime.now(timezone.utc)
     )
     db.add(human_msg)
     conversation.message_count += 1
@@ -602,7 +612,7 @@ def update_handoff_status(handoff_id: int, request: UpdateHandoffStatusRequest,
     if request.agent_name:
         handoff.agent_name = request.agent_name
     
-    handoff.updated_at = datetime.now()
+    handoff.updated_at = datetime.now(timezone.utc)
     db.commit()
     
     return {
@@ -656,7 +666,7 @@ def get_admin_stats(
     ).group_by(Customer.category).all()
     
     # 2. 过去7天对话量趋势
-    seven_days_ago = datetime.now() - timedelta(days=7)
+    seven_days_ago = datetime.now(timezone.utc) - timedelta(days=7)
     trend_stats = db.query(
         func.date(Conversation.started_at), func.count(Conversation.id)
     ).filter(Conversation.started_at >= seven_days_ago) \
@@ -698,7 +708,7 @@ def classify_customer_bg(customer_id: int, db: Session):
                 customer.category = result['category']
                 customer.priority_score = result['priority_score']
                 customer.classification_reason = result['reason']
-                customer.updated_at = datetime.now()
+                customer.updated_at = datetime.now(timezone.utc)
                 db.commit()
     except Exception as e:
         print(f"后台分类失败: {e}")
@@ -1,9 +1,32 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, Enum, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, Enum, Boolean, Computed, Index, JSON, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from sqlalchemy.sql.expression import ColumnElement
 from database import Base
-from datetime import datetime
 import enum
 
+# JSON列：PostgreSQL上使用JSONB（二进制存储，支持GIN索引与@>查询），其他数据库回退为JSON
+JSONType = JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql")
+
+
+class _LastPortCode(ColumnElement):
+    """port_codes数组的最后一个元素（destination_port生成列的表达式）"""
+    inherit_cache = True
+
+
+@compiles(_LastPortCode)
+def _last_port_code(element, compiler, **kw):
+    # SQLite的 ->> 不支持负数下标，用 '$[#-1]' 取最后一个元素
+    return "json_extract(port_codes, '$[#-1]')"
+
+
+@compiles(_LastPortCode, "postgresql")
+def _last_port_code_postgresql(element, compiler, **kw):
+    return "port_codes ->> -1"
+
+
 class CustomerCategory(str, enum.Enum):
     """客户类别枚举"""
     HIGH_VALUE = "high_value"  # 优质客户
@@ -115,8 +138,8 @@ class Customer(Base):
     classification_reason = Column(Text)
     
     # 时间戳
-    created_at = Column(DateTime, default=datetime.now)
-    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # 关系
     conversations = relationship("Conversation", back_populates="customer")
@@ -129,7 +152,7 @@ class Conversation(Base):
     __tablename__ = "conversations"
     
     id = Column(Integer, primary_key=True, index=True)
-    customer_id = Column(Integer, ForeignKey("customers.id"))
+    customer_id = Column(Integer, ForeignKey("customers.id"), index=True)
     status = Column(Enum(ConversationStatus), default=ConversationStatus.ACTIVE)
     summary = Column(Text)  # 对话摘要
     
@@ -138,12 +161,12 @@ class Conversation(Base):
     avg_confidence = Column(Float)  # 平均置信度
     
     # 时间戳
-    started_at = Column(DateTime, default=datetime.now)
-    ended_at = Column(DateTime)
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    ended_at = Column(DateTime(timezone=True))
     
     # 关系
     customer = relationship("Customer", back_populates="conversations")
-    messages = relationship("Message", back_populates="conversation")
+    messages = relationship("Message", back_populates="conversation", order_by="Message.created_at")
 
 class Message(Base):
     """消息表"""
@@ -157,14 +180,19 @@ class Message(Base):
     
     # AI相关
     ai_confidence = Column(Float)  # 0.00-1.00
-    retrieved_docs = Column(Text)  # RAG检索的文档片段（JSON格式）
+    retrieved_docs = Column(JSONType)  # RAG检索的文档片段（JSON格式）
     
     # 时间戳
-    created_at = Column(DateTime, default=datetime.now)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # 关系
     conversation = relationship("Conversation", back_populates="messages")
 
+    # 按会话取消息并按时间排序，复合索引覆盖过滤与排序
+    __table_args__ = (
+        Index("ix_messages_conversation_created", "conversation_id", "created_at"),
+    )
+
 class HandoffStatus(str, enum.Enum):
     """转人工状态枚举"""
     PENDING = "pending"      # 待处理
@@ -176,14 +204,14 @@ class Handoff(Base):
     __tablename__ = "handoffs"
     
     id = Column(Integer, primary_key=True, index=True)
-    conversation_id = Column(Integer, ForeignKey("conversations.id"))
+    conversation_id = Column(Integer, ForeignKey("conversations.id"), index=True)
     trigger_reason = Column(String(50))  # manual/low_confidence/customer_request
     agent_name = Column(String(100))  # 接管的销售人员
     status = Column(Enum(HandoffStatus), default=HandoffStatus.PENDING)
     
     # 时间戳
-    created_at = Column(DateTime, default=datetime.now)
-    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 class KBDocument(Base):
     """知识库文档元数据表"""
@@ -197,7 +225,7 @@ class KBDocument(Base):
     source_file = Column(String(200))
 
     # 时间戳
-    created_at = Column(DateTime, default=datetime.now)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
 # ========== Maritime Compliance Models ==========
@@ -207,7 +235,7 @@ class Vessel(Base):
     __tablename__ = "vessels"
 
     id = Column(Integer, primary_key=True, index=True)
-    customer_id = Column(Integer, ForeignKey("customers.id"))
+    customer_id = Column(Integer, ForeignKey("customers.id"), index=True)
     name = Column(String(200), nullable=False)
     imo_number = Column(String(20), unique=True, index=True)  # IMO Ship ID
     mmsi = Column(String(20))                                  # Maritime Mobile Service Identity
@@ -220,8 +248,8 @@ class Vessel(Base):
     classification_society = Column(String(100))              # DNV, Lloyd's, etc.
 
     # Timestamps
-    created_at = Column(DateTime, default=datetime.now)
-    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
     customer = relationship("Customer", back_populates="vessels")
@@ -235,21 +263,34 @@ class VesselRoute(Base):
     __tablename__ = "vessel_routes"
 
     id = Column(Integer, primary_key=True, index=True)
-    vessel_id = Column(Integer, ForeignKey("vessels.id"), nullable=False)
+    vessel_id = Column(Integer, ForeignKey("vessels.id"), nullable=False, index=True)
     route_name = Column(String(300), nullable=False)
-    port_codes = Column(Text, nullable=False)               # JSON array: ["CNSHA", "SGSIN", "NLRTM"]
-    origin_port = Column(String(10))                        # First port code
-    destination_port = Column(String(10))                   # Last port code
-    departure_date = Column(DateTime, nullable=True)
+    port_codes = Column(JSONType, nullable=False)           # JSON array: ["CNSHA", "SGSIN", "NLRTM"]
+    # First / last port code, generated by the database from port_codes
+    origin_port = Column(String(10), Computed("port_codes ->> 0", persisted=True))
+    destination_port = Column(String(10), Computed(_LastPortCode(), persisted=True))
+    departure_date = Column(DateTime(timezone=True), nullable=True)
     is_active = Column(Boolean, default=False, index=True)  # Only one active per vessel
 
     # Timestamps
-    created_at = Column(DateTime, default=datetime.now)
-    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
     vessel = relationship("Vessel", back_populates="routes")
 
+    __table_args__ = (
+        # Partial index for the single active route per vessel
+        Index(
+            "ix_vessel_routes_active",
+            "vessel_id",
+            postgresql_where=text("is_active"),
+            sqlite_where=text("is_active"),
+        ),
+        # GIN index for "routes calling at port X" (port_codes @> '["NLRTM"]')
+        Index("ix_vessel_routes_port_codes", "port_codes", postgresql_using="gin"),
+    )
+
 
 class Port(Base):
     """Port information table"""
@@ -273,8 +314,8 @@ class Port(Base):
     max_draft = Column(Float)                                 # meters
 
     # Timestamps
-    created_at = Column(DateTime, default=datetime.now)
-    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
     regulations = relationship("PortRegulation", back_populates="port")
@@ -298,25 +339,30 @@ class MaritimeRegulation(Base):
     full_text = Column(Text)                                  # Full regulation text
 
     # Applicability (JSON arrays)
-    applicable_vessel_types = Column(Text)                    # JSON array of VesselType
-    applicable_regions = Column(Text)                         # JSON array
-    applicable_flag_states = Column(Text)                     # JSON array
+    applicable_vessel_types = Column(JSONType)                # JSON array of VesselType
+    applicable_regions = Column(JSONType)                     # JSON array
+    applicable_flag_states = Column(JSONType)                 # JSON array
     min_gross_tonnage = Column(Float)                         # Minimum GT for applicability
 
     # Required documents (JSON array of DocumentType)
-    required_documents = Column(Text)
+    required_documents = Column(JSONType)
 
     # Metadata
-    effective_date = Column(DateTime)
-    amendment_date = Column(DateTime)
+    effective_date = Column(DateTime(timezone=True))
+    amendment_date = Column(DateTime(timezone=True))
     source_url = Column(String(500))
 
     # Vector embedding reference
     chroma_doc_id = Column(String(100))                       # Reference to ChromaDB
 
     # Timestamps
-    created_at = Column(DateTime, default=datetime.now)
-    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # GIN index for containment queries (applicable_vessel_types @> '["container"]')
+    __table_args__ = (
+        Index("ix_maritime_regulations_vessel_types", "applicable_vessel_types", postgresql_using="gin"),
+    )
 
 
 class PortRegulation(Base):
@@ -324,17 +370,17 @@ class PortRegulation(Base):
     __tablename__ = "port_regulations"
 
     id = Column(Integer, primary_key=True, index=True)
-    port_id = Column(Integer, ForeignKey("ports.id"))
-    maritime_regulation_id = Column(Integer, ForeignKey("maritime_regulations.id"), nullable=True)
+    port_id = Column(Integer, ForeignKey("ports.id"), index=True)
+    maritime_regulation_id = Column(Integer, ForeignKey("maritime_regulations.id"), nullable=True, index=True)
 
     # Port-specific requirements
     title = Column(String(500), nullable=False)
     description = Column(Text)
-    required_documents = Column(Text)                         # JSON array
+    required_documents = Column(JSONType)                     # JSON array
     advance_notice_hours = Column(Integer)                    # Hours before arrival
 
     # Applicability
-    applicable_vessel_types = Column(Text)                    # JSON array
+    applicable_vessel_types = Column(JSONType)                # JSON array
 
     # Contact info
     authority_name = Column(String(200))
@@ -344,34 +390,38 @@ class PortRegulation(Base):
     chroma_doc_id = Column(String(100))
 
     # Timestamps
-    created_at = Column(DateTime, default=datetime.now)
-    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
     port = relationship("Port", back_populates="regulations")
     maritime_regulation = relationship("MaritimeRegulation")
 
+    __table_args__ = (
+        Index("ix_port_regulations_vessel_types", "applicable_vessel_types", postgresql_using="gin"),
+    )
+
 
 class ComplianceCheck(Base):
     """Route compliance check records"""
     __tablename__ = "compliance_checks"
 
     id = Column(Integer, primary_key=True, index=True)
-    customer_id = Column(Integer, ForeignKey("customers.id"))
-    vessel_id = Column(Integer, ForeignKey("vessels.id"))
+    customer_id = Column(Integer, ForeignKey("customers.id"), index=True)
+    vessel_id = Column(Integer, ForeignKey("vessels.id"), index=True)
 
     # Route info
     route_name = Column(String(300))
-    route_ports = Column(Text)                                # JSON array of port codes
+    route_ports = Column(JSONType)                            # JSON array of port codes
 
     # Results
     overall_status = Column(Enum(ComplianceStatus))
     compliance_score = Column(Float)                          # 0-100
 
     # Detailed results (JSON)
-    port_results = Column(Text)                               # Per-port compliance details
-    missing_documents = Column(Text)                          # JSON array
-    recommendations = Column(Text)                            # JSON array
+    port_results = Column(JSONType)                           # Per-port compliance details
+    missing_documents = Column(JSONType)                      # JSON array
+    recommendations = Column(JSONType)                        # JSON array
 
     # Natural language report
     summary_report = Column(Text)
@@ -379,10 +429,10 @@ class ComplianceCheck(Base):
 
     # CrewAI metadata
     crew_run_id = Column(String(100))
-    agent_outputs = Column(Text)                              # Raw agent outputs (JSON)
+    agent_outputs = Column(JSONType)                          # Raw agent outputs (JSON)
 
     # Timestamps
-    created_at = Column(DateTime, default=datetime.now)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     customer = relationship("Customer")
@@ -7,7 +7,7 @@ to structure compliance check results.
 from datetime import datetime, date
 from enum import Enum
 from typing import List, Dict, Any, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, computed_field
 
 
 # ========== Enums ==========
@@ -193,15 +193,37 @@ class ComplianceReport(BaseModel):
     risk_assessments: List[RiskAssessment] = Field(default_factory=list)
     detention_risk: RiskLevel = RiskLevel.LOW
     
-    # Action items by priority
-    critical_actions: List[ActionItem] = Field(default_factory=list)
-    high_priority_actions: List[ActionItem] = Field(default_factory=list)
-    medium_priority_actions: List[ActionItem] = Field(default_factory=list)
-    low_priority_actions: List[ActionItem] = Field(default_factory=list)
+    # Action items (each carries its own priority); serialized through the
+    # per-priority views below so the report's JSON shape is unchanged
+    actions: List[ActionItem] = Field(default_factory=list, exclude=True)
     
     # Timeline
     compliance_timeline: List[Dict[str, Any]] = Field(default_factory=list)
 
+    def _actions_with_priority(self, priority: Priority) -> List[ActionItem]:
+        return [a for a in self.actions if a.priority == priority]
+
+    # Action items by priority (views over `actions`)
+    @computed_field
+    @property
+    def critical_actions(self) -> List[ActionItem]:
+        return self._actions_with_priority(Priority.CRITICAL)
+
+    @computed_field
+    @property
+    def high_priority_actions(self) -> List[ActionItem]:
+        return self._actions_with_priority(Priority.HIGH)
+
+    @computed_field
+    @property
+    def medium_priority_actions(self) -> List[ActionItem]:
+        return self._actions_with_priority(Priority.MEDIUM)
+
+    @computed_field
+    @property
+    def low_priority_actions(self) -> List[ActionItem]:
+        return self._actions_with_priority(Priority.LOW)
+
 
 # ========== Query Response Models ==========
 
@@ -0,0 +1,141 @@
+"""
+Persistent embedding cache for knowledge base ingestion
+
+Embeddings are stored in a local SQLite file keyed by
+SHA-256(model + content), so re-running the loaders only pays the
+embedding API for chunks whose text actually changed.
+"""
+import hashlib
+import logging
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = "./data/embedding_cache.sqlite3"
+
+# In-memory tier size (vectors) in front of the SQLite cache
+MEMORY_CACHE_SIZE = 10_000
+
+
+class EmbeddingCache:
+    """SQLite-backed store of content-hash -> embedding vector.
+
+    Safe to share between threads; access to the connection is serialized.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " hash BLOB PRIMARY KEY,"
+            " model TEXT NOT NULL,"
+            " vector BLOB NOT NULL)"
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def key(model: str, text: str) -> bytes:
+        return hashlib.sha256((model + "\0" + text).encode("utf-8")).digest()
+
+    def get_many(self, keys: List[bytes]) -> dict:
+        """Return {hash: vector} for the keys present in the cache."""
+        found = {}
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self.conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE hash IN ({placeholders})",
+                    batch,
+                )
+                for key, blob in rows:
+                    found[key] = array("d", blob).tolist()
+        return found
+
+    def put_many(self, model: str, items: List[tuple]) -> None:
+        """Store (hash, vector) pairs."""
+        rows = [(key, model, array("d", vector).tobytes()) for key, vector in items]
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (hash, model, vector) VALUES (?, ?, ?)",
+                rows,
+            )
+            self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that serves repeated chunks from cache.
+
+    Lookups go to an in-process LRU first (boilerplate chunks recur across
+    files within one run), then to the persistent EmbeddingCache; only the
+    remaining unique texts reach the embedding API.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache, memory_size: int = MEMORY_CACHE_SIZE):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model = str(getattr(embeddings, "model", type(embeddings).__name__))
+        self.memory: "OrderedDict[bytes, List[float]]" = OrderedDict()
+        self.memory_size = memory_size
+        # Guards the LRU; the embedding API call itself runs unlocked so
+        # several collections can embed concurrently
+        self._lock = threading.Lock()
+
+    def _remember(self, key: bytes, vector: List[float]) -> None:
+        self.memory[key] = vector
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.memory_size:
+            self.memory.popitem(last=False)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [EmbeddingCache.key(self.model, text) for text in texts]
+
+        # Memory tier
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self.memory:
+                    self.memory.move_to_end(key)
+                    found[key] = self.memory[key]
+        memory_hits = len(found)
+
+        # Persistent tier
+        lookup = list({key for key in keys if key not in found})
+        found.update(self.cache.get_many(lookup))
+
+        # Embed each missing text once, then scatter back into input order
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+        if missing:
+            new_vectors = self.embeddings.embed_documents(list(missing.values()))
+            new_items = list(zip(missing.keys(), new_vectors))
+            self.cache.put_many(self.model, new_items)
+            found.update(new_items)
+
+        with self._lock:
+            for key in found:
+                self._remember(key, found[key])
+
+        logger.info(
+            f"Embedding cache: {memory_hits} memory hits, "
+            f"{len(found) - memory_hits - len(missing)} disk hits, {len(missing)} embedded"
+        )
+        return [found[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
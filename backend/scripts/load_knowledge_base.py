@@ -13,17 +13,23 @@ import os
 # Add backend to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import json
+import hashlib
 import logging
-from pathlib import Path
-from typing import List, Dict, Any
+import re
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Dict, Any, Deque, Iterator, Optional, Set, Tuple
+
+import ijson
+import orjson
 
 from langchain_core.documents import Document
 from langchain_community.document_loaders import PyPDFLoader, TextLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
 from config import get_settings
-from services.maritime_knowledge_base import get_maritime_knowledge_base
+from services.maritime_knowledge_base import MaritimeKnowledgeBase, create_gemini_embeddings
+from scripts._embedding_cache import EmbeddingCache, CachedEmbeddings
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -37,16 +43,98 @@ COLLECTION_KEYWORDS = {
     "customs_documentation": ["customs", "clearance", "manifest", "declaration", "immigration"],
 }
 
+# Chunks per kb.add_documents call; Chroma/embedding throughput is best at ~100-250
+ADD_BATCH_SIZE = 200
+
+# Batches embedded/upserted at the same time (bounded by provider rate limits)
+MAX_CONCURRENT_COLLECTIONS = 3
+
+# Leading characters of each file used for collection/metadata detection
+METADATA_PREFIX_CHARS = 4096
+
+# Trailing characters of the last page (references, certificate annexes)
+METADATA_TAIL_CHARS = 2000
+
+# Size/mtime of files ingested by previous runs, used to skip unchanged files
+MANIFEST_PATH = "./data/.kb_manifest.json"
+
+
+# Convention markers for extract_metadata, checked in priority order
+CONVENTION_MARKERS = [
+    ("SOLAS", ["solas"]),
+    ("MARPOL", ["marpol"]),
+    ("STCW", ["stcw"]),
+    ("ISM Code", ["ism", "safety management"]),
+    ("ISPS Code", ["isps", "security"]),
+]
+
+# Certificates whose mention marks them as required documents
+DOC_KEYWORDS = [
+    "safety management certificate",
+    "safety construction certificate",
+    "safety equipment certificate",
+    "load line certificate",
+    "tonnage certificate",
+    "iopp certificate",
+    "isps certificate",
+    "registry certificate",
+]
+
+_ALL_KEYWORDS = sorted(
+    {kw for kws in COLLECTION_KEYWORDS.values() for kw in kws}
+    | {kw for _, kws in CONVENTION_MARKERS for kw in kws}
+    | set(DOC_KEYWORDS),
+    key=len,
+    reverse=True,
+)
+
+# One pass over the text finds every keyword: the lookahead tries each start
+# position, and longest-first alternation reports the longest keyword there.
+_KEYWORD_RE = re.compile("(?=(" + "|".join(re.escape(kw) for kw in _ALL_KEYWORDS) + "))")
+
+# Shorter keywords starting at the same position are prefixes of the longest one
+_KEYWORD_PREFIXES = {
+    kw: {other for other in _ALL_KEYWORDS if kw.startswith(other)}
+    for kw in _ALL_KEYWORDS
+}
+
+# Frozen collection order, and keyword -> index of the first collection listing it
+_COLLECTION_NAMES = tuple(COLLECTION_KEYWORDS)
+_KEYWORD_COLLECTION_RANK = {
+    kw: rank
+    for rank, keywords in reversed(list(enumerate(COLLECTION_KEYWORDS.values())))
+    for kw in keywords
+}
+
+
+def _find_keywords(text_lower: str) -> Set[str]:
+    """Return every keyword occurring in already-lowercased text."""
+    found: Set[str] = set()
+    for match in set(_KEYWORD_RE.findall(text_lower)):
+        found |= _KEYWORD_PREFIXES[match]
+    return found
+
+
+def _first_collection(hits: Set[str]) -> Optional[str]:
+    """First collection (in COLLECTION_KEYWORDS order) with a keyword in hits."""
+    ranks = [_KEYWORD_COLLECTION_RANK[kw] for kw in hits if kw in _KEYWORD_COLLECTION_RANK]
+    return _COLLECTION_NAMES[min(ranks)] if ranks else None
+
 
 def detect_collection(file_path: str, content: str = "") -> str:
-    """Detect which collection a document belongs to based on filename and content."""
-    file_lower = file_path.lower()
-    content_lower = content.lower()[:2000]  # Check first 2000 chars
+    """Detect which collection a document belongs to based on filename and content.
+
+    The file path is checked first; content is only scanned when the path
+    does not identify a collection.
+    """
+    collection = _first_collection(_find_keywords(file_path.lower()))
+    if collection:
+        return collection
 
-    for collection, keywords in COLLECTION_KEYWORDS.items():
-        for keyword in keywords:
-            if keyword in file_lower or keyword in content_lower:
-                return collection
+    # Check first 2000 chars of content
+    collection = _first_collection(_find_keywords(content[:2000].lower()))
+    if collection:
+        return collection
 
     # Default to imo_conventions
     return "imo_conventions"
@@ -59,130 +147,269 @@ def extract_metadata(file_path: str, content: str) -> Dict[str, Any]:
         "file_path": file_path,
     }
 
+    hits = _find_keywords(content.lower())
+
     # Try to extract document type from content
-    content_lower = content.lower()
-
-    if "solas" in content_lower:
-        metadata["source_convention"] = "SOLAS"
-    elif "marpol" in content_lower:
-        metadata["source_convention"] = "MARPOL"
-    elif "stcw" in content_lower:
-        metadata["source_convention"] = "STCW"
-    elif "ism" in content_lower or "safety management" in content_lower:
-        metadata["source_convention"] = "ISM Code"
-    elif "isps" in content_lower or "security" in content_lower:
-        metadata["source_convention"] = "ISPS Code"
-
-    # Extract required documents if mentioned
-    required_docs = []
-    doc_keywords = [
-        "safety management certificate",
-        "safety construction certificate",
-        "safety equipment certificate",
-        "load line certificate",
-        "tonnage certificate",
-        "iopp certificate",
-        "isps certificate",
-        "registry certificate",
-    ]
+    for convention, markers in CONVENTION_MARKERS:
+        if any(marker in hits for marker in markers):
+            metadata["source_convention"] = convention
+            break
 
-    for doc in doc_keywords:
-        if doc in content_lower:
-            required_docs.append(doc.replace(" ", "_"))
+    # Extract required documents if mentioned (sorted for stable metadata)
+    required_docs = sorted(doc.replace(" ", "_") for doc in hits.intersection(DOC_KEYWORDS))
 
     if required_docs:
-        metadata["required_documents"] = json.dumps(required_docs)
+        metadata["required_documents"] = orjson.dumps(required_docs).decode()
 
-    return metadata
+    # Every chunk of the file shares these values; intern so repeats are one object
+    return {key: sys.intern(value) for key, value in metadata.items()}
 
 
-def load_pdf(file_path: str) -> List[Document]:
-    """Load a PDF file."""
-    try:
-        loader = PyPDFLoader(file_path)
-        return loader.load()
-    except Exception as e:
-        logger.error(f"Error loading PDF {file_path}: {e}")
-        return []
+def load_pdf(file_path: str) -> Iterator[Document]:
+    """Lazily load a PDF file, one Document per page."""
+    loader = PyPDFLoader(file_path)
+    yield from loader.lazy_load()
+
+
+def load_text(file_path: str) -> Iterator[Document]:
+    """Lazily load a text file."""
+    loader = TextLoader(file_path, encoding='utf-8')
+    yield from loader.lazy_load()
+
+
+# Per-process text splitter, built once by _init_worker
+_SPLITTER: Optional[RecursiveCharacterTextSplitter] = None
+
+
+def _init_worker() -> None:
+    """ProcessPoolExecutor initializer: build the splitter once per worker."""
+    global _SPLITTER
+    # Token-sized chunks so each fits the embedding model's budget
+    _SPLITTER = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+        encoding_name="cl100k_base",
+        chunk_size=512,
+        chunk_overlap=128,
+    )
+
 
+def _process_file(file_str: str) -> Optional[Tuple[str, List[Document]]]:
+    """Load, classify and chunk a single file.
+
+    Runs in a worker process, so it must stay a top-level function.
+    Pages are split as they stream in; only the first METADATA_PREFIX_CHARS
+    characters and the tail of the last page are kept for collection
+    detection and metadata extraction.
+    Returns (collection, chunks), or None if the file could not be loaded;
+    a file that fails partway through is skipped entirely, so it gets no
+    manifest entry and is retried on the next run.
+    """
+    logger.info(f"Processing: {os.path.basename(file_str)}")
 
-def load_text(file_path: str) -> List[Document]:
-    """Load a text file."""
+    if _SPLITTER is None:
+        _init_worker()
+    text_splitter = _SPLITTER
+
+    # Load based on file type
+    pages = load_pdf(file_str) if file_str.lower().endswith('.pdf') else load_text(file_str)
+
+    prefix_parts: List[str] = []
+    prefix_len = 0
+    tail = ""
+    chunks: List[Document] = []
     try:
-        loader = TextLoader(file_path, encoding='utf-8')
-        return loader.load()
+        for page in pages:
+            if prefix_len < METADATA_PREFIX_CHARS:
+                prefix_parts.append(page.page_content)
+                prefix_len += len(page.page_content) + 1
+                tail = ""
+            else:
+                tail = page.page_content[-METADATA_TAIL_CHARS:]
+
+            # Split into chunks
+            chunks.extend(text_splitter.split_documents([page]))
     except Exception as e:
-        logger.error(f"Error loading text file {file_path}: {e}")
-        return []
-
-
-def load_documents_from_directory(directory: str) -> Dict[str, List[Document]]:
-    """Load all documents from a directory, organized by collection."""
-    documents_by_collection: Dict[str, List[Document]] = {
-        "imo_conventions": [],
-        "psc_requirements": [],
-        "port_regulations": [],
-        "regional_requirements": [],
-        "customs_documentation": [],
-    }
+        # Skip the whole file rather than ingest the pages read before the error
+        logger.error(f"Error loading {file_str}: {e}")
+        return None
 
-    # Text splitter for chunking
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200,
-        length_function=len,
-    )
+    if not prefix_parts:
+        return None
 
-    path = Path(directory)
-    if not path.exists():
-        logger.warning(f"Directory does not exist: {directory}")
-        return documents_by_collection
+    content_window = " ".join(prefix_parts)[:METADATA_PREFIX_CHARS]
+    if tail:
+        content_window += " " + tail
 
-    # Find all supported files
-    supported_extensions = ['.pdf', '.txt', '.md']
-    files = []
-    for ext in supported_extensions:
-        files.extend(path.rglob(f'*{ext}'))
+    # Detect collection
+    collection = detect_collection(file_str, content_window)
 
-    logger.info(f"Found {len(files)} files to process")
+    # Extract metadata
+    base_metadata = extract_metadata(file_str, content_window)
 
-    for file_path in files:
-        file_str = str(file_path)
-        logger.info(f"Processing: {file_path.name}")
+    # Add metadata to each chunk (one merge per chunk; values shared by reference)
+    for chunk in chunks:
+        chunk.metadata = {**base_metadata, **chunk.metadata}
 
-        # Load based on file type
-        if file_path.suffix.lower() == '.pdf':
-            docs = load_pdf(file_str)
-        else:
-            docs = load_text(file_str)
+    return collection, chunks
 
-        if not docs:
-            continue
 
-        # Combine content for metadata extraction
-        full_content = " ".join([d.page_content for d in docs])
+def _content_hash(chunk: Document) -> bytes:
+    return hashlib.blake2b(chunk.page_content.encode("utf-8"), digest_size=16).digest()
 
-        # Detect collection
-        collection = detect_collection(file_str, full_content)
 
-        # Extract metadata
-        base_metadata = extract_metadata(file_str, full_content)
+class CollectionBuffer:
+    """Per-collection chunk buffer that ingests each batch as soon as it fills.
 
-        # Split into chunks
-        chunks = text_splitter.split_documents(docs)
+    Full ADD_BATCH_SIZE batches are handed to a small thread pool, so
+    embedding and upserting overlap with parsing of the next files and peak
+    memory stays around batch size x collections rather than the whole corpus.
+    At most 2 x MAX_CONCURRENT_COLLECTIONS batches are in flight.
 
-        # Add metadata to each chunk
+    Repeated passages (preambles, appendix tables) are dropped per collection.
+    Other files carrying the same text are recorded on the kept chunk as a
+    JSON list in metadata["also_in"] (Chroma metadata must be scalar) while
+    that chunk is still buffered.
+    """
+
+    def __init__(self, kb, batch_size: int = ADD_BATCH_SIZE, max_workers: int = MAX_CONCURRENT_COLLECTIONS):
+        self.kb = kb
+        self.batch_size = batch_size
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.max_pending = 2 * max_workers
+        self.pending: Deque[Future] = deque()
+        self.buffers: Dict[str, List[Tuple[bytes, Document]]] = {}
+        # hash -> (kept chunk, other sources); chunk is None once submitted
+        self.seen: Dict[str, Dict[bytes, Tuple[Optional[Document], List[str]]]] = {}
+        self.added = 0
+        self.duplicates = 0
+
+    def add(self, collection: str, chunks: List[Document]) -> None:
+        buffer = self.buffers.setdefault(collection, [])
+        seen = self.seen.setdefault(collection, {})
         for chunk in chunks:
-            chunk.metadata.update(base_metadata)
+            h = _content_hash(chunk)
+            if h not in seen:
+                seen[h] = (chunk, [])
+                buffer.append((h, chunk))
+                continue
+
+            self.duplicates += 1
+            kept, also_in = seen[h]
+            source = chunk.metadata.get("source_file")
+            if kept is not None and source and source != kept.metadata.get("source_file") and source not in also_in:
+                also_in.append(source)
+                kept.metadata["also_in"] = orjson.dumps(also_in).decode()
+
+        while len(buffer) >= self.batch_size:
+            self._submit(collection, buffer[:self.batch_size])
+            del buffer[:self.batch_size]
+
+    def _submit(self, collection: str, batch: List[Tuple[bytes, Document]]) -> None:
+        # Stop annotating chunks once a worker thread may be reading them
+        seen = self.seen[collection]
+        for h, _ in batch:
+            seen[h] = (None, seen[h][1])
+
+        while len(self.pending) >= self.max_pending:
+            self.added += self.pending.popleft().result()
+        self.pending.append(
+            self.executor.submit(self.kb.add_documents, collection, [chunk for _, chunk in batch])
+        )
+
+    def flush(self) -> int:
+        """Ingest everything still buffered and wait; returns total chunks added."""
+        for collection, buffer in self.buffers.items():
+            if buffer:
+                self._submit(collection, buffer[:])
+                buffer.clear()
+        while self.pending:
+            self.added += self.pending.popleft().result()
+        self.executor.shutdown()
+        if self.duplicates:
+            logger.info(f"Skipped {self.duplicates} duplicate chunks")
+        return self.added
+
+
+def load_manifest(path: str = MANIFEST_PATH) -> Dict[str, Dict[str, Any]]:
+    """Load the ingestion manifest ({file_path: {size, mtime, collection}})."""
+    try:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest: Dict[str, Dict[str, Any]], path: str = MANIFEST_PATH) -> None:
+    """Write the ingestion manifest."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(orjson.dumps(manifest, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
+
+
+def _file_signature(file_path: str) -> Dict[str, int]:
+    st = os.stat(file_path)
+    return {"size": st.st_size, "mtime": int(st.st_mtime)}
+
+
+def load_documents_from_directory(
+    directory: str,
+    buffer: CollectionBuffer,
+    manifest: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> None:
+    """Load all documents from a directory into the collection buffer.
+
+    Files are parsed and chunked in parallel worker processes (PDF parsing and
+    splitting are CPU-bound); results are buffered here in file order.
 
-        documents_by_collection[collection].extend(chunks)
-        logger.info(f"  -> Added {len(chunks)} chunks to {collection}")
+    When a manifest is given, files whose size and mtime match the manifest
+    and whose chunks are already in their collection are skipped. The
+    manifest is updated in place for every file processed.
+    """
+    if not os.path.exists(directory):
+        logger.warning(f"Directory does not exist: {directory}")
+        return
+
+    # Find all supported files in a single tree walk
+    supported_extensions = {'.pdf', '.txt', '.md'}
+    files = []
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if os.path.splitext(name)[1].lower() in supported_extensions:
+                files.append(os.path.join(root, name))
+
+    signatures = {}
+    if manifest is not None:
+        pending = []
+        for file_path in files:
+            signatures[file_path] = _file_signature(file_path)
+            entry = manifest.get(file_path)
+            if (
+                entry is not None
+                and entry.get("size") == signatures[file_path]["size"]
+                and entry.get("mtime") == signatures[file_path]["mtime"]
+                and buffer.kb.has_source_file(entry.get("collection"), os.path.basename(file_path))
+            ):
+                continue
+            pending.append(file_path)
+        if len(pending) < len(files):
+            logger.info(f"Skipping {len(files) - len(pending)} unchanged files")
+        files = pending
+
+    logger.info(f"Found {len(files)} files to process")
 
-    return documents_by_collection
+    with ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=_init_worker) as executor:
+        for file_path, result in zip(files, executor.map(_process_file, files, chunksize=4)):
+            if result is None:
+                continue
 
+            collection, chunks = result
+            buffer.add(collection, chunks)
+            if manifest is not None:
+                manifest[file_path] = {**signatures[file_path], "collection": collection}
+            logger.info(f"  -> Added {len(chunks)} chunks from {os.path.basename(file_path)} to {collection}")
 
-def load_from_json(json_file: str) -> Dict[str, List[Document]]:
-    """Load documents from a JSON file.
+
+def load_from_json(json_file: str) -> Iterator[Tuple[str, Document]]:
+    """Lazily load (collection, Document) pairs from a JSON file.
 
     Expected JSON format:
     [
@@ -197,34 +424,24 @@ def load_from_json(json_file: str) -> Dict[str, List[Document]]:
         }
     ]
     """
-    documents_by_collection: Dict[str, List[Document]] = {
-        "imo_conventions": [],
-        "psc_requirements": [],
-        "port_regulations": [],
-        "regional_requirements": [],
-        "customs_documentation": [],
-    }
-
+    loaded = 0
     try:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-
-        for item in data:
-            collection = item.get("collection", "imo_conventions")
-            content = item.get("content", "")
-            metadata = item.get("metadata", {})
+        with open(json_file, 'rb') as f:
+            # Stream items one at a time instead of loading the whole array
+            for item in ijson.items(f, 'item', use_float=True):
+                collection = item.get("collection", "imo_conventions")
+                content = item.get("content", "")
+                metadata = item.get("metadata", {})
 
-            if collection in documents_by_collection and content:
-                doc = Document(page_content=content, metadata=metadata)
-                documents_by_collection[collection].append(doc)
+                if collection in COLLECTION_KEYWORDS and content:
+                    loaded += 1
+                    yield collection, Document(page_content=content, metadata=metadata)
 
-        logger.info(f"Loaded {sum(len(docs) for docs in documents_by_collection.values())} documents from JSON")
+        logger.info(f"Loaded {loaded} documents from JSON")
 
     except Exception as e:
         logger.error(f"Error loading JSON file: {e}")
 
-    return documents_by_collection
-
 
 def main():
     """Main function to load documents into the knowledge base."""
@@ -234,7 +451,10 @@ def main():
 
     # Initialize knowledge base
     logger.info("Initializing knowledge base...")
-    kb = get_maritime_knowledge_base()
+    # Serve unchanged chunks from the persistent embedding cache
+    embedding_cache = EmbeddingCache()
+    cached_embeddings = CachedEmbeddings(create_gemini_embeddings(), embedding_cache)
+    kb = MaritimeKnowledgeBase(embeddings=cached_embeddings)
 
     if kb.embeddings is None:
         logger.error("Embeddings not initialized. Check your Google API key.")
@@ -248,24 +468,22 @@ def main():
     regulations_dir = "./data/maritime_regulations"
     logger.info(f"\nLoading documents from: {regulations_dir}")
 
-    documents_by_collection = load_documents_from_directory(regulations_dir)
+    # Batches are ingested as they fill, while later files are still parsing
+    buffer = CollectionBuffer(kb)
+    manifest = load_manifest()
+    load_documents_from_directory(regulations_dir, buffer, manifest)
 
     # Also check for a JSON file
     json_file = os.path.join(regulations_dir, "regulations.json")
     if os.path.exists(json_file):
         logger.info(f"\nLoading documents from JSON: {json_file}")
-        json_docs = load_from_json(json_file)
-        for collection, docs in json_docs.items():
-            documents_by_collection[collection].extend(docs)
-
-    # Add documents to collections
-    total_added = 0
-    for collection_name, documents in documents_by_collection.items():
-        if documents:
-            logger.info(f"\nAdding {len(documents)} documents to {collection_name}...")
-            count = kb.add_documents(collection_name, documents)
-            total_added += count
-            logger.info(f"  Added {count} documents")
+        # Each document goes to the buffer as soon as it is parsed
+        for collection, doc in load_from_json(json_file):
+            buffer.add(collection, [doc])
+
+    # Ingest the remaining partial batches
+    total_added = buffer.flush()
+    save_manifest(manifest)
 
     # Show final stats
     logger.info("\n" + "=" * 60)
@@ -274,6 +492,8 @@ def main():
     logger.info(f"Final collection stats: {final_stats}")
     logger.info(f"Total documents added: {total_added}")
 
+    embedding_cache.close()
+
 
 if __name__ == "__main__":
     main()
@@ -25,27 +25,229 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import json
 import logging
-from datetime import datetime
-from typing import List, Dict, Any
+import re
+import sqlite3
+import textwrap
+from bisect import bisect_right
+from dataclasses import dataclass, field, fields, is_dataclass
+from datetime import date, datetime
+from enum import Enum, IntFlag
+from functools import lru_cache
+from typing import List, Dict, Any, Callable, FrozenSet, Optional, Set, Tuple
 from langchain_core.documents import Document
-from services.maritime_knowledge_base import get_maritime_knowledge_base
+from services.maritime_knowledge_base import MaritimeKnowledgeBase, create_gemini_embeddings
+from scripts._embedding_cache import EmbeddingCache, CachedEmbeddings
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Revision date shared by the data sets below (a date, so filters compare directly)
+_UPDATED_2024_01_01 = date(2024, 1, 1)
+
+
+# =============================================================================
+# RECORD TYPES
+# =============================================================================
+
+class Convention(str, Enum):
+    """IMO conventions covered by IMO_CONVENTIONS_DATA."""
+    SOLAS = "SOLAS"
+    MARPOL = "MARPOL"
+    STCW = "STCW"
+    LOAD_LINE = "Load Line"
+    TONNAGE = "Tonnage"
+    BWM = "BWM"
+
+
+# Patterns for parse_content, compiled once
+_HEADING_RE = re.compile(r"^(?!-|\d+\.\s)(\S.*):$")
+_ITEM_RE = re.compile(r"^(?:-|\d+\.)\s+(.*)$")
+_VALIDITY_RE = re.compile(r"^([^:]+):\s*(.*\bvalid\b.*)$", re.IGNORECASE)
+_FULL_DATE_RE = re.compile(
+    r"\b(\d{1,2}) (January|February|March|April|May|June|July|August|"
+    r"September|October|November|December) (\d{4})\b"
+)
+_LEADING_YEAR_RE = re.compile(r"^(\d{4})\b")
+
+
+@dataclass(frozen=True, slots=True)
+class ParsedContent:
+    """Structured view of a record's content, extracted once at import."""
+    # Heading (without the colon) -> bullet / numbered items under it
+    sections: Dict[str, Tuple[str, ...]]
+    # Items under any "... Requirements" heading
+    requirements: Tuple[str, ...]
+    # (effective date, item) for dated headings such as "2024 Updates"
+    updates: Tuple[Tuple[date, str], ...]
+    # Certificate or document -> validity text, e.g. "Valid 5 years"
+    certificate_validity: Dict[str, str]
+
+
+def _heading_date(heading: str) -> Optional[date]:
+    match = _FULL_DATE_RE.search(heading)
+    if match:
+        return datetime.strptime(" ".join(match.groups()), "%d %B %Y").date()
+    match = _LEADING_YEAR_RE.match(heading)
+    if match:
+        return date(int(match.group(1)), 1, 1)
+    return None
+
+
+def parse_content(text: str) -> ParsedContent:
+    """Split a record's content into headed item lists.
+
+    Items start with "- " or "N. " at the left margin; indented lines are
+    folded into the item above them. Text outside a heading is ignored.
+    """
+    sections: Dict[str, List[str]] = {}
+    certificate_validity: Dict[str, str] = {}
+    items: Optional[List[str]] = None
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        heading = _HEADING_RE.match(line)
+        if heading:
+            items = sections.setdefault(heading.group(1), [])
+            continue
+        if items is None:
+            continue
+        item = _ITEM_RE.match(line)
+        if item and not line[0].isspace():
+            items.append(item.group(1))
+            # Certificate lists are "- Name: Valid ..." bullets
+            validity = _VALIDITY_RE.match(item.group(1))
+            if line.startswith("-") and validity:
+                certificate_validity[validity.group(1).strip()] = validity.group(2)
+        elif items:
+            items[-1] += " " + line.strip()
+
+    requirements: List[str] = []
+    updates: List[Tuple[date, str]] = []
+    for heading, heading_items in sections.items():
+        if "requirements" in heading.lower():
+            requirements.extend(heading_items)
+        effective = _heading_date(heading)
+        if effective is not None:
+            updates.extend((effective, item) for item in heading_items)
+
+    return ParsedContent(
+        sections={heading: tuple(heading_items) for heading, heading_items in sections.items()},
+        requirements=tuple(requirements),
+        updates=tuple(updates),
+        certificate_validity=certificate_validity,
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class ShipContext:
+    """Ship particulars that applicability rules are evaluated against.
+
+    vessel_type uses the VesselType values from models (e.g. "tanker",
+    "passenger"). Particulars left as None are unknown, and rules treat
+    unknown as applicable: a record is only excluded when the ship is
+    known to fall outside it.
+    """
+    gross_tonnage: float
+    vessel_type: str = "other"
+    international: bool = True
+    length_m: Optional[float] = None
+    persons_on_board: Optional[int] = None
+    engine_power_kw: Optional[float] = None
+    carries_ballast_water: Optional[bool] = None
+    carries_noxious_liquids: Optional[bool] = None
+    carries_packaged_dangerous_goods: Optional[bool] = None
+
+
+def _applies_to_all(ship: ShipContext) -> bool:
+    return True
+
+
+@dataclass(frozen=True, slots=True)
+class ConventionRecord:
+    """One chapter or annex of an IMO convention."""
+    convention: Convention
+    full_name: str
+    content: str
+    source_convention: str
+    last_updated: date
+    applicability: str
+    chapter: Optional[str] = None
+    chapter_title: Optional[str] = None
+    annex: Optional[str] = None
+    annex_title: Optional[str] = None
+    required_certificates: Tuple[str, ...] = ()
+    required_documents: Tuple[str, ...] = ()
+    # Machine-checkable form of applicability; the string is kept for display
+    applicability_rule: Callable[[ShipContext], bool] = field(
+        default=_applies_to_all, repr=False, compare=False
+    )
+    parsed: ParsedContent = field(init=False, repr=False, compare=False)
+    # Certificates and documents together, for O(1) "requires X" checks
+    required: FrozenSet[str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Normalize the triple-quoted body once instead of in every consumer
+        object.__setattr__(self, "content", textwrap.dedent(self.content).strip())
+        object.__setattr__(self, "parsed", parse_content(self.content))
+        object.__setattr__(
+            self, "required", frozenset(self.required_certificates + self.required_documents)
+        )
+
+    @property
+    def section(self) -> str:
+        """Chapter or annex identifier, e.g. "II-2" or "VI"."""
+        return self.chapter or self.annex or ""
+
+
+@dataclass(frozen=True, slots=True)
+class PSCRegimeRecord:
+    """Port State Control regime (MOU or national programme)."""
+    psc_regime: str
+    full_name: str
+    region: str
+    member_states: Tuple[str, ...]
+    content: str
+    source: str
+    last_updated: date
+    inspection_rate: str
+    priority_areas: Tuple[str, ...] = ()
+    # member_states as a set, for O(1) "is this flag a member" checks
+    member_state_set: FrozenSet[str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "content", textwrap.dedent(self.content).strip())
+        object.__setattr__(self, "member_state_set", frozenset(self.member_states))
+
+
+@dataclass(frozen=True, slots=True)
+class RegionalRequirementRecord:
+    """Regional regulatory requirement (EU MRV/ETS, ECAs, ...)."""
+    requirement_type: str
+    requirement_name: str
+    full_name: str
+    region: str
+    content: str
+    source: str
+    last_updated: date
+    applicability: str
+    required_documents: Tuple[str, ...] = ()
+
+    def __post_init__(self):
+        object.__setattr__(self, "content", textwrap.dedent(self.content).strip())
+
 
 # =============================================================================
 # IMO CONVENTIONS DATA
 # =============================================================================
 
-IMO_CONVENTIONS_DATA: List[Dict[str, Any]] = [
+IMO_CONVENTIONS_DATA: Tuple[ConventionRecord, ...] = (
     # SOLAS Convention
-    {
-        "convention": "SOLAS",
-        "full_name": "International Convention for the Safety of Life at Sea, 1974",
-        "chapter": "I",
-        "chapter_title": "General Provisions",
-        "content": """
+    ConventionRecord(
+        convention=Convention.SOLAS,
+        full_name="International Convention for the Safety of Life at Sea, 1974",
+        chapter="I",
+        chapter_title="General Provisions",
+        content="""
 SOLAS Chapter I - General Provisions covers the application of the convention, surveys and certificates,
 and port state control provisions.
 
@@ -70,18 +272,19 @@ Amendments entering force 1 January 2024:
 - GMDSS modernization requirements
 - Revised Chapter IV radiocommunications
         """,
-        "source_convention": "SOLAS 1974 as amended",
-        "last_updated": "2024-01-01",
-        "applicability": "Ships engaged on international voyages",
-        "required_certificates": ["Passenger Ship Safety Certificate", "Cargo Ship Safety Construction Certificate",
-                                  "Cargo Ship Safety Equipment Certificate", "Cargo Ship Safety Radio Certificate"]
-    },
-    {
-        "convention": "SOLAS",
-        "full_name": "International Convention for the Safety of Life at Sea, 1974",
-        "chapter": "II-1",
-        "chapter_title": "Construction - Structure, subdivision and stability, machinery and electrical installations",
-        "content": """
+        source_convention="SOLAS 1974 as amended",
+        last_updated=_UPDATED_2024_01_01,
+        applicability="Ships engaged on international voyages",
+        applicability_rule=lambda ship: ship.international,
+        required_certificates=("Passenger Ship Safety Certificate", "Cargo Ship Safety Construction Certificate",
+                                  "Cargo Ship Safety Equipment Certificate", "Cargo Ship Safety Radio Certificate")
+    ),
+    ConventionRecord(
+        convention=Convention.SOLAS,
+        full_name="International Convention for the Safety of Life at Sea, 1974",
+        chapter="II-1",
+        chapter_title="Construction - Structure, subdivision and stability, machinery and electrical installations",
+        content="""
 SOLAS Chapter II-1 covers ship construction requirements including structure, subdivision, stability,
 machinery and electrical installations.
 
@@ -101,17 +304,17 @@ Required Documentation:
 - New regulation II-1/3-13 on lifting appliances and anchor handling winches (ships constructed on/after 1 Jan 2026)
 - Electronic inclinometer requirement for containerships and bulk carriers ≥3000 GT (constructed on/after 1 Jan 2026)
         """,
-        "source_convention": "SOLAS 1974 as amended",
-        "last_updated": "2024-01-01",
-        "applicability": "All passenger ships and cargo ships",
-        "required_documents": ["Stability Booklet", "Damage Control Plan", "Loading Manual"]
-    },
-    {
-        "convention": "SOLAS",
-        "full_name": "International Convention for the Safety of Life at Sea, 1974",
-        "chapter": "II-2",
-        "chapter_title": "Fire protection, fire detection and fire extinction",
-        "content": """
+        source_convention="SOLAS 1974 as amended",
+        last_updated=_UPDATED_2024_01_01,
+        applicability="All passenger ships and cargo ships",
+        required_documents=("Stability Booklet", "Damage Control Plan", "Loading Manual")
+    ),
+    ConventionRecord(
+        convention=Convention.SOLAS,
+        full_name="International Convention for the Safety of Life at Sea, 1974",
+        chapter="II-2",
+        chapter_title="Fire protection, fire detection and fire extinction",
+        content="""
 SOLAS Chapter II-2 covers fire safety requirements for ships.
 
 Key Principles:
@@ -135,17 +338,17 @@ Required Certificates and Documents:
 - PFOS ban: Use or storage of fire extinguishing media containing perfluorooctane sulfonic acid (PFOS)
   prohibited after first survey on/after 1 January 2026 (Resolution MSC.532(107))
         """,
-        "source_convention": "SOLAS 1974 as amended",
-        "last_updated": "2024-01-01",
-        "applicability": "All ships",
-        "required_documents": ["Fire Control Plan", "Fire Training Manual", "Fire Safety Systems Maintenance Plan"]
-    },
-    {
-        "convention": "SOLAS",
-        "full_name": "International Convention for the Safety of Life at Sea, 1974",
-        "chapter": "III",
-        "chapter_title": "Life-saving appliances and arrangements",
-        "content": """
+        source_convention="SOLAS 1974 as amended",
+        last_updated=_UPDATED_2024_01_01,
+        applicability="All ships",
+        required_documents=("Fire Control Plan", "Fire Training Manual", "Fire Safety Systems Maintenance Plan")
+    ),
+    ConventionRecord(
+        convention=Convention.SOLAS,
+        full_name="International Convention for the Safety of Life at Sea, 1974",
+        chapter="III",
+        chapter_title="Life-saving appliances and arrangements",
+        content="""
 SOLAS Chapter III covers life-saving appliances and arrangements.
 
 Key Requirements:
@@ -170,17 +373,17 @@ Drill Requirements:
 - Lifeboat drills must include lowering lifeboats, starting engines
 - All crew must participate in at least one abandon ship drill and fire drill per month
         """,
-        "source_convention": "SOLAS 1974 as amended",
-        "last_updated": "2024-01-01",
-        "applicability": "All ships",
-        "required_documents": ["LSA Form E", "Training Manual", "Muster List", "Drill Records"]
-    },
-    {
-        "convention": "SOLAS",
-        "full_name": "International Convention for the Safety of Life at Sea, 1974",
-        "chapter": "IV",
-        "chapter_title": "Radiocommunications",
-        "content": """
+        source_convention="SOLAS 1974 as amended",
+        last_updated=_UPDATED_2024_01_01,
+        applicability="All ships",
+        required_documents=("LSA Form E", "Training Manual", "Muster List", "Drill Records")
+    ),
+    ConventionRecord(
+        convention=Convention.SOLAS,
+        full_name="International Convention for the Safety of Life at Sea, 1974",
+        chapter="IV",
+        chapter_title="Radiocommunications",
+        content="""
 SOLAS Chapter IV covers radio communication requirements (revised 1 January 2024).
 
 GMDSS (Global Maritime Distress and Safety System) Requirements:
@@ -207,18 +410,19 @@ GMDSS (Global Maritime Distress and Safety System) Requirements:
 - Communication equipment moved from Chapter III to Chapter IV
 - Existing certificates don't need reissue before expiry due to reorganization
         """,
-        "source_convention": "SOLAS 1974 as amended",
-        "last_updated": "2024-01-01",
-        "applicability": "All ships of 300 GT and above on international voyages",
-        "required_certificates": ["Cargo Ship Safety Radio Certificate"],
-        "required_documents": ["Radio Record Book", "GMDSS Radio Log"]
-    },
-    {
-        "convention": "SOLAS",
-        "full_name": "International Convention for the Safety of Life at Sea, 1974",
-        "chapter": "V",
-        "chapter_title": "Safety of Navigation",
-        "content": """
+        source_convention="SOLAS 1974 as amended",
+        last_updated=_UPDATED_2024_01_01,
+        applicability="All ships of 300 GT and above on international voyages",
+        applicability_rule=lambda ship: ship.international and ship.gross_tonnage >= 300,
+        required_certificates=("Cargo Ship Safety Radio Certificate",),
+        required_documents=("Radio Record Book", "GMDSS Radio Log")
+    ),
+    ConventionRecord(
+        convention=Convention.SOLAS,
+        full_name="International Convention for the Safety of Life at Sea, 1974",
+        chapter="V",
+        chapter_title="Safety of Navigation",
+        content="""
 SOLAS Chapter V covers safety of navigation requirements.
 
 Key Requirements:
@@ -248,17 +452,18 @@ Key Requirements:
 2026 Requirements:
 - Electronic inclinometer for containerships and bulk carriers ≥3000 GT (constructed on/after 1 Jan 2026)
         """,
-        "source_convention": "SOLAS 1974 as amended",
-        "last_updated": "2024-01-01",
-        "applicability": "All ships on international voyages",
-        "required_documents": ["Voyage Plan", "Navigation Records", "AIS Data"]
-    },
-    {
-        "convention": "SOLAS",
-        "full_name": "International Convention for the Safety of Life at Sea, 1974",
-        "chapter": "IX",
-        "chapter_title": "Management for the Safe Operation of Ships (ISM Code)",
-        "content": """
+        source_convention="SOLAS 1974 as amended",
+        last_updated=_UPDATED_2024_01_01,
+        applicability="All ships on international voyages",
+        applicability_rule=lambda ship: ship.international,
+        required_documents=("Voyage Plan", "Navigation Records", "AIS Data")
+    ),
+    ConventionRecord(
+        convention=Convention.SOLAS,
+        full_name="International Convention for the Safety of Life at Sea, 1974",
+        chapter="IX",
+        chapter_title="Management for the Safe Operation of Ships (ISM Code)",
+        content="""
 SOLAS Chapter IX makes the International Safety Management (ISM) Code mandatory.
 
 ISM Code Objectives:
@@ -288,18 +493,19 @@ Application:
 - Passenger ships (including passenger high-speed craft): Since 1 July 1998
 - Cargo ships and mobile offshore drilling units ≥500 GT: Since 1 July 2002
         """,
-        "source_convention": "SOLAS 1974 / ISM Code",
-        "last_updated": "2024-01-01",
-        "applicability": "Passenger ships and cargo ships ≥500 GT",
-        "required_certificates": ["Document of Compliance (DOC)", "Safety Management Certificate (SMC)"],
-        "required_documents": ["Safety Management Manual", "SMS Procedures", "Internal Audit Records"]
-    },
-    {
-        "convention": "SOLAS",
-        "full_name": "International Convention for the Safety of Life at Sea, 1974",
-        "chapter": "XI-1",
-        "chapter_title": "Special measures to enhance maritime safety",
-        "content": """
+        source_convention="SOLAS 1974 / ISM Code",
+        last_updated=_UPDATED_2024_01_01,
+        applicability="Passenger ships and cargo ships ≥500 GT",
+        applicability_rule=lambda ship: ship.vessel_type == "passenger" or ship.gross_tonnage >= 500,
+        required_certificates=("Document of Compliance (DOC)", "Safety Management Certificate (SMC)"),
+        required_documents=("Safety Management Manual", "SMS Procedures", "Internal Audit Records")
+    ),
+    ConventionRecord(
+        convention=Convention.SOLAS,
+        full_name="International Convention for the Safety of Life at Sea, 1974",
+        chapter="XI-1",
+        chapter_title="Special measures to enhance maritime safety",
+        content="""
 SOLAS Chapter XI-1 covers special measures to enhance maritime safety.
 
 Key Requirements:
@@ -321,17 +527,18 @@ Key Requirements:
      Administration issuing DOC
    - Must be kept on board and updated when changes occur
         """,
-        "source_convention": "SOLAS 1974 as amended",
-        "last_updated": "2024-01-01",
-        "applicability": "All ships engaged on international voyages",
-        "required_documents": ["Continuous Synopsis Record (CSR)"]
-    },
-    {
-        "convention": "SOLAS",
-        "full_name": "International Convention for the Safety of Life at Sea, 1974",
-        "chapter": "XI-2",
-        "chapter_title": "Special measures to enhance maritime security (ISPS Code)",
-        "content": """
+        source_convention="SOLAS 1974 as amended",
+        last_updated=_UPDATED_2024_01_01,
+        applicability="All ships engaged on international voyages",
+        applicability_rule=lambda ship: ship.international,
+        required_documents=("Continuous Synopsis Record (CSR)",)
+    ),
+    ConventionRecord(
+        convention=Convention.SOLAS,
+        full_name="International Convention for the Safety of Life at Sea, 1974",
+        chapter="XI-2",
+        chapter_title="Special measures to enhance maritime security (ISPS Code)",
+        content="""
 SOLAS Chapter XI-2 makes the International Ship and Port Facility Security (ISPS) Code mandatory.
 
 ISPS Code Structure:
@@ -373,19 +580,20 @@ Application:
 - Cargo ships ≥500 GT (including high-speed cargo craft)
 - Mobile offshore drilling units
         """,
-        "source_convention": "SOLAS 1974 / ISPS Code",
-        "last_updated": "2024-01-01",
-        "applicability": "Passenger ships and cargo ships ≥500 GT",
-        "required_certificates": ["International Ship Security Certificate (ISSC)"],
-        "required_documents": ["Ship Security Plan (SSP)", "Ship Security Assessment (SSA)"]
-    },
+        source_convention="SOLAS 1974 / ISPS Code",
+        last_updated=_UPDATED_2024_01_01,
+        applicability="Passenger ships and cargo ships ≥500 GT",
+        applicability_rule=lambda ship: ship.vessel_type == "passenger" or ship.gross_tonnage >= 500,
+        required_certificates=("International Ship Security Certificate (ISSC)",),
+        required_documents=("Ship Security Plan (SSP)", "Ship Security Assessment (SSA)")
+    ),
     # MARPOL Convention
-    {
-        "convention": "MARPOL",
-        "full_name": "International Convention for the Prevention of Pollution from Ships",
-        "annex": "I",
-        "annex_title": "Prevention of Pollution by Oil",
-        "content": """
+    ConventionRecord(
+        convention=Convention.MARPOL,
+        full_name="International Convention for the Prevention of Pollution from Ships",
+        annex="I",
+        annex_title="Prevention of Pollution by Oil",
+        content="""
 MARPOL Annex I - Regulations for the Prevention of Pollution by Oil (entered into force 2 October 1983)
 
 Key Requirements:
@@ -418,18 +626,19 @@ Required Documents:
 - Oil Record Book Part II (Cargo/ballast operations) - Oil tankers ≥150 GT
 - Shipboard Oil Pollution Emergency Plan (SOPEP) - All ships ≥400 GT and oil tankers ≥150 GT
         """,
-        "source_convention": "MARPOL 73/78",
-        "last_updated": "2024-01-01",
-        "applicability": "All ships ≥400 GT, oil tankers ≥150 GT",
-        "required_certificates": ["International Oil Pollution Prevention (IOPP) Certificate"],
-        "required_documents": ["Oil Record Book Part I", "Oil Record Book Part II", "SOPEP"]
-    },
-    {
-        "convention": "MARPOL",
-        "full_name": "International Convention for the Prevention of Pollution from Ships",
-        "annex": "II",
-        "annex_title": "Control of Pollution by Noxious Liquid Substances in Bulk",
-        "content": """
+        source_convention="MARPOL 73/78",
+        last_updated=_UPDATED_2024_01_01,
+        applicability="All ships ≥400 GT, oil tankers ≥150 GT",
+        applicability_rule=lambda ship: ship.gross_tonnage >= 400 or (ship.vessel_type == "tanker" and ship.gross_tonnage >= 150),
+        required_certificates=("International Oil Pollution Prevention (IOPP) Certificate",),
+        required_documents=("Oil Record Book Part I", "Oil Record Book Part II", "SOPEP")
+    ),
+    ConventionRecord(
+        convention=Convention.MARPOL,
+        full_name="International Convention for the Prevention of Pollution from Ships",
+        annex="II",
+        annex_title="Control of Pollution by Noxious Liquid Substances in Bulk",
+        content="""
 MARPOL Annex II - Regulations for the Control of Pollution by Noxious Liquid Substances Carried in Bulk
 
 Key Requirements:
@@ -460,18 +669,19 @@ Required Documents:
 - Procedures and Arrangements Manual (P&A Manual)
 - Shipboard Marine Pollution Emergency Plan for Noxious Liquid Substances (SMPEP)
         """,
-        "source_convention": "MARPOL 73/78",
-        "last_updated": "2024-01-01",
-        "applicability": "Chemical tankers and NLS carriers",
-        "required_certificates": ["NLS Certificate"],
-        "required_documents": ["Cargo Record Book", "P&A Manual", "SMPEP"]
-    },
-    {
-        "convention": "MARPOL",
-        "full_name": "International Convention for the Prevention of Pollution from Ships",
-        "annex": "III",
-        "annex_title": "Prevention of Pollution by Harmful Substances Carried by Sea in Packaged Form",
-        "content": """
+        source_convention="MARPOL 73/78",
+        last_updated=_UPDATED_2024_01_01,
+        applicability="Chemical tankers and NLS carriers",
+        applicability_rule=lambda ship: ship.carries_noxious_liquids is not False,
+        required_certificates=("NLS Certificate",),
+        required_documents=("Cargo Record Book", "P&A Manual", "SMPEP")
+    ),
+    ConventionRecord(
+        convention=Convention.MARPOL,
+        full_name="International Convention for the Prevention of Pollution from Ships",
+        annex="III",
+        annex_title="Prevention of Pollution by Harmful Substances Carried by Sea in Packaged Form",
+        content="""
 MARPOL Annex III - Prevention of Pollution by Harmful Substances Carried by Sea in Packaged Form
 
 Key Requirements:
@@ -500,17 +710,18 @@ Required Documents:
 - Dangerous Goods Manifest or Stowage Plan (identifying location of marine pollutants)
 - Document of Compliance for ships carrying dangerous goods (if applicable)
         """,
-        "source_convention": "MARPOL 73/78",
-        "last_updated": "2024-01-01",
-        "applicability": "Ships carrying harmful substances in packaged form",
-        "required_documents": ["Dangerous Goods Manifest", "Stowage Plan"]
-    },
-    {
-        "convention": "MARPOL",
-        "full_name": "International Convention for the Prevention of Pollution from Ships",
-        "annex": "IV",
-        "annex_title": "Prevention of Pollution by Sewage from Ships",
-        "content": """
+        source_convention="MARPOL 73/78",
+        last_updated=_UPDATED_2024_01_01,
+        applicability="Ships carrying harmful substances in packaged form",
+        applicability_rule=lambda ship: ship.carries_packaged_dangerous_goods is not False,
+        required_documents=("Dangerous Goods Manifest", "Stowage Plan")
+    ),
+    ConventionRecord(
+        convention=Convention.MARPOL,
+        full_name="International Convention for the Prevention of Pollution from Ships",
+        annex="IV",
+        annex_title="Prevention of Pollution by Sewage from Ships",
+        content="""
 MARPOL Annex IV - Prevention of Pollution by Sewage from Ships
 
 Key Requirements:
@@ -538,18 +749,21 @@ Required Documents:
 - Sewage treatment plant operation manual
 - Records of sewage discharge operations
         """,
-        "source_convention": "MARPOL 73/78",
-        "last_updated": "2024-01-01",
-        "applicability": "Ships ≥400 GT or certified to carry >15 persons on international voyages",
-        "required_certificates": ["International Sewage Pollution Prevention Certificate (ISPP)"],
-        "required_documents": ["Operation Manual", "Discharge Records"]
-    },
-    {
-        "convention": "MARPOL",
-        "full_name": "International Convention for the Prevention of Pollution from Ships",
-        "annex": "V",
-        "annex_title": "Prevention of Pollution by Garbage from Ships",
-        "content": """
+        source_convention="MARPOL 73/78",
+        last_updated=_UPDATED_2024_01_01,
+        applicability="Ships ≥400 GT or certified to carry >15 persons on international voyages",
+        applicability_rule=lambda ship: ship.international and (
+            ship.gross_tonnage >= 400 or ship.persons_on_board is None or ship.persons_on_board > 15
+        ),
+        required_certificates=("International Sewage Pollution Prevention Certificate (ISPP)",),
+        required_documents=("Operation Manual", "Discharge Records")
+    ),
+    ConventionRecord(
+        convention=Convention.MARPOL,
+        full_name="International Convention for the Prevention of Pollution from Ships",
+        annex="V",
+        annex_title="Prevention of Pollution by Garbage from Ships",
+        content="""
 MARPOL Annex V - Prevention of Pollution by Garbage from Ships (Revised 2013)
 
 COMPLETE BAN on discharge of all plastics into the sea.
@@ -577,17 +791,17 @@ Record Book Entries:
 - Estimated amount discharged or incinerated
 - Signature of officer in charge
         """,
-        "source_convention": "MARPOL 73/78",
-        "last_updated": "2024-01-01",
-        "applicability": "All ships",
-        "required_documents": ["Garbage Management Plan", "Garbage Record Book", "Disposal Placard"]
-    },
-    {
-        "convention": "MARPOL",
-        "full_name": "International Convention for the Prevention of Pollution from Ships",
-        "annex": "VI",
-        "annex_title": "Prevention of Air Pollution from Ships",
-        "content": """
+        source_convention="MARPOL 73/78",
+        last_updated=_UPDATED_2024_01_01,
+        applicability="All ships",
+        required_documents=("Garbage Management Plan", "Garbage Record Book", "Disposal Placard")
+    ),
+    ConventionRecord(
+        convention=Convention.MARPOL,
+        full_name="International Convention for the Prevention of Pollution from Ships",
+        annex="VI",
+        annex_title="Prevention of Air Pollution from Ships",
+        content="""
 MARPOL Annex VI - Regulations for the Prevention of Air Pollution from Ships
 
 SULPHUR OXIDE (SOx) EMISSIONS:
@@ -626,19 +840,22 @@ Required Documents:
 - SEEMP Part I (Energy Efficiency Plan)
 - SEEMP Part II (Fuel oil consumption data collection)
         """,
-        "source_convention": "MARPOL 73/78",
-        "last_updated": "2024-01-01",
-        "applicability": "Ships ≥400 GT, engines >130 kW",
-        "required_certificates": ["IAPP Certificate", "EIAPP Certificate", "IEE Certificate"],
-        "required_documents": ["Bunker Delivery Notes", "SEEMP", "Technical File", "Fuel Changeover Procedure"]
-    },
+        source_convention="MARPOL 73/78",
+        last_updated=_UPDATED_2024_01_01,
+        applicability="Ships ≥400 GT, engines >130 kW",
+        applicability_rule=lambda ship: (
+            ship.gross_tonnage >= 400 or ship.engine_power_kw is None or ship.engine_power_kw > 130
+        ),
+        required_certificates=("IAPP Certificate", "EIAPP Certificate", "IEE Certificate"),
+        required_documents=("Bunker Delivery Notes", "SEEMP", "Technical File", "Fuel Changeover Procedure")
+    ),
     # STCW Convention
-    {
-        "convention": "STCW",
-        "full_name": "International Convention on Standards of Training, Certification and Watchkeeping for Seafarers, 1978",
-        "chapter": "General",
-        "chapter_title": "Standards of Competence and Certification",
-        "content": """
+    ConventionRecord(
+        convention=Convention.STCW,
+        full_name="International Convention on Standards of Training, Certification and Watchkeeping for Seafarers, 1978",
+        chapter="General",
+        chapter_title="Standards of Competence and Certification",
+        content="""
 STCW Convention - Standards of Training, Certification and Watchkeeping for Seafarers
 
 Purpose: Establish international standards for the training, certification and watchkeeping of seafarers.
@@ -678,19 +895,19 @@ Required Records:
    - Record of rest hours
    - Evidence of medical fitness (Medical Certificate valid max 2 years)
         """,
-        "source_convention": "STCW 1978 as amended (Manila 2010)",
-        "last_updated": "2024-01-01",
-        "applicability": "All seafarers serving on seagoing ships",
-        "required_certificates": ["Certificate of Competency", "Certificates of Proficiency", "Medical Certificate"],
-        "required_documents": ["Training Record Book", "Rest Hour Records"]
-    },
+        source_convention="STCW 1978 as amended (Manila 2010)",
+        last_updated=_UPDATED_2024_01_01,
+        applicability="All seafarers serving on seagoing ships",
+        required_certificates=("Certificate of Competency", "Certificates of Proficiency", "Medical Certificate"),
+        required_documents=("Training Record Book", "Rest Hour Records")
+    ),
     # Load Line Convention
-    {
-        "convention": "Load Line",
-        "full_name": "International Convention on Load Lines, 1966",
-        "chapter": "General",
-        "chapter_title": "Freeboard and Load Line Marks",
-        "content": """
+    ConventionRecord(
+        convention=Convention.LOAD_LINE,
+        full_name="International Convention on Load Lines, 1966",
+        chapter="General",
+        chapter_title="Freeboard and Load Line Marks",
+        content="""
 International Load Line Convention (LL 66/88) - Freeboard Assignment
 
 Purpose: Ensure ships have sufficient reserve buoyancy and stability for safe operation.
@@ -727,19 +944,20 @@ Required Documents:
 - Loading manual
 - Record of structural alterations
         """,
-        "source_convention": "Load Line Convention 1966/1988 Protocol",
-        "last_updated": "2024-01-01",
-        "applicability": "Ships ≥24m in length on international voyages",
-        "required_certificates": ["International Load Line Certificate"],
-        "required_documents": ["Stability Information", "Loading Manual"]
-    },
+        source_convention="Load Line Convention 1966/1988 Protocol",
+        last_updated=_UPDATED_2024_01_01,
+        applicability="Ships ≥24m in length on international voyages",
+        applicability_rule=lambda ship: ship.international and (ship.length_m is None or ship.length_m >= 24),
+        required_certificates=("International Load Line Certificate",),
+        required_documents=("Stability Information", "Loading Manual")
+    ),
     # Tonnage Convention
-    {
-        "convention": "Tonnage",
-        "full_name": "International Convention on Tonnage Measurement of Ships, 1969",
-        "chapter": "General",
-        "chapter_title": "Gross and Net Tonnage Measurement",
-        "content": """
+    ConventionRecord(
+        convention=Convention.TONNAGE,
+        full_name="International Convention on Tonnage Measurement of Ships, 1969",
+        chapter="General",
+        chapter_title="Gross and Net Tonnage Measurement",
+        content="""
 International Tonnage Convention 1969 - Ship Tonnage Measurement
 
 Purpose: Establish uniform principles for tonnage measurement of ships engaged on international voyages.
@@ -773,18 +991,19 @@ Important Notes:
   - ≥500 GT: ISM, ISPS
   - ≥3000 GT: Additional SOLAS requirements
         """,
-        "source_convention": "Tonnage Convention 1969",
-        "last_updated": "2024-01-01",
-        "applicability": "All ships on international voyages",
-        "required_certificates": ["International Tonnage Certificate (1969)"]
-    },
+        source_convention="Tonnage Convention 1969",
+        last_updated=_UPDATED_2024_01_01,
+        applicability="All ships on international voyages",
+        applicability_rule=lambda ship: ship.international,
+        required_certificates=("International Tonnage Certificate (1969)",)
+    ),
     # Ballast Water Convention
-    {
-        "convention": "BWM",
-        "full_name": "International Convention for the Control and Management of Ships' Ballast Water and Sediments, 2004",
-        "chapter": "General",
-        "chapter_title": "Ballast Water Management",
-        "content": """
+    ConventionRecord(
+        convention=Convention.BWM,
+        full_name="International Convention for the Control and Management of Ships' Ballast Water and Sediments, 2004",
+        chapter="General",
+        chapter_title="Ballast Water Management",
+        content="""
 Ballast Water Management Convention (BWM Convention) - entered into force 8 September 2017
 
 Purpose: Prevent spread of harmful aquatic organisms and pathogens through ships' ballast water.
@@ -828,30 +1047,174 @@ Required Documents:
 - Ballast Water Record Book
 - Type Approval Certificate for BWMS (if D-2 standard)
         """,
-        "source_convention": "BWM Convention 2004",
-        "last_updated": "2024-01-01",
-        "applicability": "Ships designed to carry ballast water on international voyages",
-        "required_certificates": ["International Ballast Water Management Certificate"],
-        "required_documents": ["Ballast Water Management Plan", "Ballast Water Record Book"]
-    },
-]
+        source_convention="BWM Convention 2004",
+        last_updated=_UPDATED_2024_01_01,
+        applicability="Ships designed to carry ballast water on international voyages",
+        applicability_rule=lambda ship: ship.international and ship.carries_ballast_water is not False,
+        required_certificates=("International Ballast Water Management Certificate",),
+        required_documents=("Ballast Water Management Plan", "Ballast Water Record Book")
+    ),
+)
+
+# Lookup indexes over IMO_CONVENTIONS_DATA, built once at import
+_BY_CHAPTER: Dict[Tuple[Convention, str], ConventionRecord] = {}
+_BY_ANNEX: Dict[Tuple[Convention, str], ConventionRecord] = {}
+for _record in IMO_CONVENTIONS_DATA:
+    if _record.chapter is not None:
+        _BY_CHAPTER[(_record.convention, _record.chapter)] = _record
+    if _record.annex is not None:
+        _BY_ANNEX[(_record.convention, _record.annex)] = _record
+_BY_CONVENTION: Dict[Convention, Tuple[ConventionRecord, ...]] = {
+    convention: tuple(r for r in IMO_CONVENTIONS_DATA if r.convention == convention)
+    for convention in dict.fromkeys(r.convention for r in IMO_CONVENTIONS_DATA)
+}
+
+
+def _reverse_index(field_name: str) -> Dict[str, FrozenSet[str]]:
+    """Map each name in a record tuple field to the "CONVENTION/section" ids listing it."""
+    index: Dict[str, Set[str]] = {}
+    for record in IMO_CONVENTIONS_DATA:
+        record_id = f"{record.convention.value}/{record.section}"
+        for name in getattr(record, field_name):
+            index.setdefault(name, set()).add(record_id)
+    return {name: frozenset(ids) for name, ids in index.items()}
+
+
+def _requirements_by_document() -> Dict[str, Tuple[str, ...]]:
+    """Map each required document to every requirement listing it, across data sets.
+
+    IMO records are named "CONVENTION/section"; regional and customs
+    entries by requirement_name. Values keep data-set order.
+    """
+    index: Dict[str, List[str]] = {}
+    for record in IMO_CONVENTIONS_DATA:
+        for name in record.required_documents:
+            index.setdefault(name, []).append(f"{record.convention.value}/{record.section}")
+    for requirement in _regional_requirements_data():
+        for name in requirement.required_documents:
+            index.setdefault(name, []).append(requirement.requirement_name)
+    for requirement in CUSTOMS_DOCUMENTATION_DATA:
+        for name in requirement["required_documents"]:
+            index.setdefault(name, []).append(requirement["requirement_name"])
+    return {name: tuple(names) for name, names in index.items()}
+
+
+# Module attributes built on first access (PEP 562), then cached in globals()
+_LAZY_ATTRIBUTES: Dict[str, Callable[[], Any]] = {
+    # Certificate name -> "CONVENTION/section" ids requiring it
+    "CONVENTIONS_BY_CERT": lambda: _reverse_index("required_certificates"),
+    # Document name -> "CONVENTION/section" ids requiring it
+    "CONVENTIONS_BY_DOCUMENT": lambda: _reverse_index("required_documents"),
+    # Document name -> IMO, regional and customs requirements listing it
+    "REQUIREMENTS_BY_DOCUMENT": _requirements_by_document,
+}
+
+
+def __getattr__(name: str) -> Any:
+    builder = _LAZY_ATTRIBUTES.get(name)
+    if builder is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = globals()[name] = builder()
+    return value
+
+
+def get_by_convention(convention: Convention) -> Tuple[ConventionRecord, ...]:
+    """All records of a convention, e.g. get_by_convention(Convention.SOLAS).
+
+    Plain names also work, since Convention members compare and hash as
+    their string values.
+    """
+    return _BY_CONVENTION.get(convention, ())
+
+
+def get_by_chapter(convention: Convention, chapter: str) -> Optional[ConventionRecord]:
+    """Record for a convention chapter, e.g. get_by_chapter("SOLAS", "II-2")."""
+    return _BY_CHAPTER.get((convention, chapter))
+
+
+def get_by_annex(convention: Convention, annex: str) -> Optional[ConventionRecord]:
+    """Record for a convention annex, e.g. get_by_annex("MARPOL", "VI")."""
+    return _BY_ANNEX.get((convention, annex))
+
+
+# "- ≥300 GT: AIS, GMDSS" lines in the Tonnage Convention notes
+_GT_THRESHOLD_RE = re.compile(r"^\s*-\s*≥(\d+)\s*GT:\s*(.+)$", re.MULTILINE)
+
+# (minimum GT, requirements triggered), ascending by GT
+GT_THRESHOLDS: Tuple[Tuple[int, Tuple[str, ...]], ...] = tuple(sorted(
+    (int(gt), tuple(item.strip() for item in requirements.split(",")))
+    for gt, requirements in _GT_THRESHOLD_RE.findall(
+        get_by_chapter(Convention.TONNAGE, "General").content
+    )
+))
+# Fail at import if the Tonnage notes are reworded and the pattern stops matching
+assert GT_THRESHOLDS, "no GT thresholds parsed from the Tonnage Convention notes"
+_GT_THRESHOLD_VALUES: Tuple[int, ...] = tuple(gt for gt, _ in GT_THRESHOLDS)
+
+
+def requirements_for_gt(gross_tonnage: float) -> Tuple[str, ...]:
+    """Requirements triggered by every GT threshold the ship reaches.
+
+    e.g. requirements_for_gt(600) -> ("AIS", "GMDSS", "MARPOL Annex I/IV/V", "ISM", "ISPS")
+    """
+    reached = bisect_right(_GT_THRESHOLD_VALUES, gross_tonnage)
+    return tuple(item for _, items in GT_THRESHOLDS[:reached] for item in items)
+
+
+def applicable_conventions(ship: ShipContext) -> List[ConventionRecord]:
+    """Convention records whose applicability rule matches the ship."""
+    return [record for record in IMO_CONVENTIONS_DATA if record.applicability_rule(ship)]
+
+
+@lru_cache(maxsize=1)
+def _content_index() -> sqlite3.Connection:
+    """In-memory FTS5 index over IMO convention content, built on first search."""
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    conn.execute(
+        "CREATE VIRTUAL TABLE conventions USING fts5(convention, section, content, tokenize='unicode61')"
+    )
+    conn.executemany(
+        "INSERT INTO conventions (rowid, convention, section, content) VALUES (?, ?, ?, ?)",
+        [
+            (i, record.convention.value, record.section, record.content)
+            for i, record in enumerate(IMO_CONVENTIONS_DATA)
+        ],
+    )
+    return conn
+
+
+def search_conventions(query: str, limit: int = 5) -> List[ConventionRecord]:
+    """Full-text search over IMO convention content, best match first.
+
+    Every whitespace-separated term must occur, e.g. 'Tier III NOx' or
+    'II-2'; terms are quoted, so FTS5 operators in the query are literal.
+    """
+    # Quote each term as an FTS5 string so "-", "'" and ":" can't be parsed as syntax
+    terms = ['"' + term.replace('"', '""') + '"' for term in query.split()]
+    if not terms:
+        return []
+    rows = _content_index().execute(
+        "SELECT rowid FROM conventions WHERE conventions MATCH ? ORDER BY rank LIMIT ?",
+        (" ".join(terms), limit),
+    )
+    return [IMO_CONVENTIONS_DATA[rowid] for (rowid,) in rows]
 
 
 # =============================================================================
 # PORT STATE CONTROL DATA
 # =============================================================================
 
-PSC_REQUIREMENTS_DATA: List[Dict[str, Any]] = [
+PSC_REQUIREMENTS_DATA: Tuple[PSCRegimeRecord, ...] = (
     # Paris MOU
-    {
-        "psc_regime": "Paris MOU",
-        "full_name": "Paris Memorandum of Understanding on Port State Control",
-        "region": "Europe and North Atlantic",
-        "member_states": ["Belgium", "Bulgaria", "Canada", "Croatia", "Cyprus", "Denmark", "Estonia",
+    PSCRegimeRecord(
+        psc_regime="Paris MOU",
+        full_name="Paris Memorandum of Understanding on Port State Control",
+        region="Europe and North Atlantic",
+        member_states=("Belgium", "Bulgaria", "Canada", "Croatia", "Cyprus", "Denmark", "Estonia",
                          "Finland", "France", "Germany", "Greece", "Iceland", "Ireland", "Italy",
                          "Latvia", "Lithuania", "Malta", "Netherlands", "Norway", "Poland", "Portugal",
-                         "Romania", "Russia", "Slovenia", "Spain", "Sweden", "United Kingdom"],
-        "content": """
+                         "Romania", "Russia", "Slovenia", "Spain", "Sweden", "United Kingdom"),
+        content="""
 Paris MOU - Port State Control in Europe and North Atlantic
 
 Inspection Targeting - New Inspection Regime (NIR):
@@ -892,20 +1255,20 @@ Common Detainable Deficiencies:
 - Crew competency issues
 - Working and living conditions (MLC)
         """,
-        "source": "Paris MOU Secretariat",
-        "last_updated": "2024-01-01",
-        "inspection_rate": "25% of ships calling at ports",
-        "priority_areas": ["ISM compliance", "Fire safety", "Life-saving appliances", "MARPOL compliance"]
-    },
+        source="Paris MOU Secretariat",
+        last_updated=_UPDATED_2024_01_01,
+        inspection_rate="25% of ships calling at ports",
+        priority_areas=("ISM compliance", "Fire safety", "Life-saving appliances", "MARPOL compliance")
+    ),
     # Tokyo MOU
-    {
-        "psc_regime": "Tokyo MOU",
-        "full_name": "Memorandum of Understanding on Port State Control in the Asia-Pacific Region",
-        "region": "Asia-Pacific",
-        "member_states": ["Australia", "Canada", "Chile", "China", "Fiji", "Hong Kong", "Indonesia",
+    PSCRegimeRecord(
+        psc_regime="Tokyo MOU",
+        full_name="Memorandum of Understanding on Port State Control in the Asia-Pacific Region",
+        region="Asia-Pacific",
+        member_states=("Australia", "Canada", "Chile", "China", "Fiji", "Hong Kong", "Indonesia",
                          "Japan", "Korea", "Malaysia", "New Zealand", "Papua New Guinea", "Peru",
-                         "Philippines", "Russia", "Singapore", "Thailand", "Vanuatu", "Vietnam"],
-        "content": """
+                         "Philippines", "Russia", "Singapore", "Thailand", "Vanuatu", "Vietnam"),
+        content="""
 Tokyo MOU - Port State Control in Asia-Pacific Region
 
 New Inspection Regime (NIR) - implemented 1 January 2014:
@@ -946,18 +1309,18 @@ Information Sharing:
 - APCIS (Asia-Pacific Computerized Information System)
 - Shared with other MOU regions
         """,
-        "source": "Tokyo MOU Secretariat",
-        "last_updated": "2024-01-01",
-        "inspection_rate": "80% inspection rate target",
-        "priority_areas": ["STCW compliance", "ISM/ISPS", "MARPOL Annex VI", "MLC 2006"]
-    },
+        source="Tokyo MOU Secretariat",
+        last_updated=_UPDATED_2024_01_01,
+        inspection_rate="80% inspection rate target",
+        priority_areas=("STCW compliance", "ISM/ISPS", "MARPOL Annex VI", "MLC 2006")
+    ),
     # USCG PSC
-    {
-        "psc_regime": "USCG",
-        "full_name": "United States Coast Guard Port State Control",
-        "region": "United States",
-        "member_states": ["United States"],
-        "content": """
+    PSCRegimeRecord(
+        psc_regime="USCG",
+        full_name="United States Coast Guard Port State Control",
+        region="United States",
+        member_states=("United States",),
+        content="""
 US Coast Guard Port State Control Program
 
 The USCG does not participate in a MOU but maintains its own PSC program aligned with IMO standards.
@@ -1005,20 +1368,20 @@ Penalties:
 - Detention until deficiencies corrected
 - Denial of entry for repeat offenders
         """,
-        "source": "US Coast Guard",
-        "last_updated": "2024-01-01",
-        "inspection_rate": "All foreign vessels examined",
-        "priority_areas": ["QUALSHIP 21", "MTSA security", "MARPOL compliance", "Crew competency"]
-    },
+        source="US Coast Guard",
+        last_updated=_UPDATED_2024_01_01,
+        inspection_rate="All foreign vessels examined",
+        priority_areas=("QUALSHIP 21", "MTSA security", "MARPOL compliance", "Crew competency")
+    ),
     # Indian Ocean MOU
-    {
-        "psc_regime": "Indian Ocean MOU",
-        "full_name": "Indian Ocean Memorandum of Understanding on Port State Control",
-        "region": "Indian Ocean",
-        "member_states": ["Australia", "Bangladesh", "Comoros", "Djibouti", "Eritrea", "Ethiopia", "France",
+    PSCRegimeRecord(
+        psc_regime="Indian Ocean MOU",
+        full_name="Indian Ocean Memorandum of Understanding on Port State Control",
+        region="Indian Ocean",
+        member_states=("Australia", "Bangladesh", "Comoros", "Djibouti", "Eritrea", "Ethiopia", "France",
                          "India", "Iran", "Kenya", "Maldives", "Mauritius", "Mozambique", "Myanmar",
-                         "Oman", "Seychelles", "South Africa", "Sri Lanka", "Sudan", "Tanzania", "Yemen"],
-        "content": """
+                         "Oman", "Seychelles", "South Africa", "Sri Lanka", "Sudan", "Tanzania", "Yemen"),
+        content="""
 Indian Ocean MOU - Port State Control in Indian Ocean Region
 
 Risk-Based Targeting System:
@@ -1056,18 +1419,18 @@ Regional Concerns:
 - Crew welfare (MLC 2006)
 - Pollution prevention (high traffic shipping lanes)
         """,
-        "source": "Indian Ocean MOU Secretariat",
-        "last_updated": "2024-01-01",
-        "inspection_rate": "Risk-based approach",
-        "priority_areas": ["ISPS security", "Piracy countermeasures", "MLC welfare", "Pollution prevention"]
-    },
+        source="Indian Ocean MOU Secretariat",
+        last_updated=_UPDATED_2024_01_01,
+        inspection_rate="Risk-based approach",
+        priority_areas=("ISPS security", "Piracy countermeasures", "MLC welfare", "Pollution prevention")
+    ),
     # Common PSC Inspection Checklist
-    {
-        "psc_regime": "Common",
-        "full_name": "Common PSC Inspection Requirements",
-        "region": "Global",
-        "member_states": ["All"],
-        "content": """
+    PSCRegimeRecord(
+        psc_regime="Common",
+        full_name="Common PSC Inspection Requirements",
+        region="Global",
+        member_states=("All",),
+        content="""
 Common Port State Control Inspection Requirements - All Regions
 
 Initial Inspection (Certificate and Document Check):
@@ -1134,26 +1497,142 @@ Clear Grounds for More Detailed Inspection:
 - Previous detention record
 - Passenger ship safety concerns
         """,
-        "source": "IMO Procedures for PSC 2023",
-        "last_updated": "2024-01-01",
-        "inspection_rate": "Per regional MOU",
-        "priority_areas": ["Certificates validity", "Crew competency", "Safety equipment", "Operational compliance"]
-    },
-]
+        source="IMO Procedures for PSC 2023",
+        last_updated=_UPDATED_2024_01_01,
+        inspection_rate="Per regional MOU",
+        priority_areas=("Certificates validity", "Crew competency", "Safety equipment", "Operational compliance")
+    ),
+)
+
+# Lookup indexes over PSC_REQUIREMENTS_DATA, built once at import
+_PSC_REGIME_BY_NAME: Dict[str, PSCRegimeRecord] = {
+    regime.psc_regime: regime for regime in PSC_REQUIREMENTS_DATA
+}
+_psc_regimes_by_state: Dict[str, List[str]] = {}
+for _regime in PSC_REQUIREMENTS_DATA:
+    for _state in _regime.member_states:
+        _psc_regimes_by_state.setdefault(_state, []).append(_regime.psc_regime)
+_PSC_REGIMES_BY_STATE: Dict[str, Tuple[str, ...]] = {
+    state: tuple(regimes) for state, regimes in _psc_regimes_by_state.items()
+}
+del _psc_regimes_by_state
+
+
+def get_psc_regime(name: str) -> Optional[PSCRegimeRecord]:
+    """PSC regime record by name, e.g. get_psc_regime("Tokyo MOU")."""
+    return _PSC_REGIME_BY_NAME.get(name)
+
+
+def psc_regimes_for_flag(state: str) -> Tuple[str, ...]:
+    """PSC regimes whose member states include the given state.
+
+    e.g. psc_regimes_for_flag("Australia") -> ("Tokyo MOU", "Indian Ocean MOU").
+    The global "Common" checklist is listed under the member state "All".
+    """
+    return _PSC_REGIMES_BY_STATE.get(state, ())
+
+
+class PSCCert(IntFlag):
+    """Statutory certificates from the Common PSC checklist, one bit each.
+
+    A ship's certificate portfolio is a single PSCCert value, so the
+    missing certificates are simply ``required & ~held``.
+    """
+    CERT_OF_REGISTRY = 1 << 0
+    TONNAGE_1969 = 1 << 1
+    LOAD_LINE = 1 << 2
+    CARGO_SAFETY_CONSTRUCTION = 1 << 3
+    CARGO_SAFETY_EQUIPMENT = 1 << 4
+    CARGO_SAFETY_RADIO = 1 << 5
+    PASSENGER_SAFETY = 1 << 6
+    IOPP = 1 << 7
+    NLS = 1 << 8
+    SEWAGE = 1 << 9
+    IAPP = 1 << 10
+    BALLAST_WATER = 1 << 11
+    ENERGY_EFFICIENCY = 1 << 12
+    DOC = 1 << 13
+    SMC = 1 << 14
+    ISSC = 1 << 15
+    MLC = 1 << 16
+
+
+# Checklist wording of each certificate, as in the "Common" regime content
+PSC_CERT_NAMES: Dict[PSCCert, str] = {
+    PSCCert.CERT_OF_REGISTRY: "Certificate of Registry",
+    PSCCert.TONNAGE_1969: "International Tonnage Certificate (1969)",
+    PSCCert.LOAD_LINE: "International Load Line Certificate",
+    PSCCert.CARGO_SAFETY_CONSTRUCTION: "Cargo Ship Safety Construction Certificate",
+    PSCCert.CARGO_SAFETY_EQUIPMENT: "Cargo Ship Safety Equipment Certificate",
+    PSCCert.CARGO_SAFETY_RADIO: "Cargo Ship Safety Radio Certificate",
+    PSCCert.PASSENGER_SAFETY: "Passenger Ship Safety Certificate",
+    PSCCert.IOPP: "International Oil Pollution Prevention Certificate (IOPP)",
+    PSCCert.NLS: "International Pollution Prevention Certificate for Carriage of NLS",
+    PSCCert.SEWAGE: "International Sewage Pollution Prevention Certificate",
+    PSCCert.IAPP: "International Air Pollution Prevention Certificate (IAPP)",
+    PSCCert.BALLAST_WATER: "International Ballast Water Management Certificate",
+    PSCCert.ENERGY_EFFICIENCY: "International Energy Efficiency Certificate",
+    PSCCert.DOC: "Document of Compliance (DOC)",
+    PSCCert.SMC: "Safety Management Certificate (SMC)",
+    PSCCert.ISSC: "International Ship Security Certificate (ISSC)",
+    PSCCert.MLC: "Maritime Labour Certificate (MLC)",
+}
+_PSC_CERT_BY_NAME: Dict[str, PSCCert] = {name: cert for cert, name in PSC_CERT_NAMES.items()}
+
+_CARGO_SHIP_SAFETY = (
+    PSCCert.CARGO_SAFETY_CONSTRUCTION | PSCCert.CARGO_SAFETY_EQUIPMENT | PSCCert.CARGO_SAFETY_RADIO
+)
+# Everything on the checklist except the "(if applicable)" entries
+_PSC_CARGO_SHIP_CERTS = ~(PSCCert.PASSENGER_SAFETY | PSCCert.NLS)
+_PSC_PASSENGER_SHIP_CERTS = (_PSC_CARGO_SHIP_CERTS & ~_CARGO_SHIP_SAFETY) | PSCCert.PASSENGER_SAFETY
+
+# VesselType value -> certificates the Common checklist expects on board
+REQUIRED_FOR_SHIP_TYPE: Dict[str, PSCCert] = {
+    vessel_type: _PSC_PASSENGER_SHIP_CERTS if vessel_type == "passenger" else _PSC_CARGO_SHIP_CERTS
+    for vessel_type in (
+        "container", "tanker", "bulk_carrier", "ro_ro", "general_cargo",
+        "lng_carrier", "passenger", "fishing", "offshore", "other",
+    )
+}
+
+
+def psc_certs_from_names(names: List[str]) -> PSCCert:
+    """Fold certificate names (checklist wording) into a PSCCert; unknown names are ignored."""
+    held = PSCCert(0)
+    for name in names:
+        held |= _PSC_CERT_BY_NAME.get(name, 0)
+    return held
+
+
+def required_psc_certs(ship: ShipContext) -> PSCCert:
+    """Certificates a PSC inspector expects for this ship.
+
+    NLS is included unless the ship is known not to carry noxious liquids.
+    """
+    required = REQUIRED_FOR_SHIP_TYPE.get(ship.vessel_type, _PSC_CARGO_SHIP_CERTS)
+    if ship.carries_noxious_liquids is not False:
+        required |= PSCCert.NLS
+    return required
+
+
+def missing_psc_certs(ship: ShipContext, held: PSCCert) -> PSCCert:
+    """Required certificates not in held; bool() or .bit_count() summarize it."""
+    return required_psc_certs(ship) & ~held
 
 
 # =============================================================================
 # REGIONAL REQUIREMENTS DATA
 # =============================================================================
 
-REGIONAL_REQUIREMENTS_DATA: List[Dict[str, Any]] = [
+# requirement_name -> record builder; records are constructed on first use
+_REGIONAL_REQUIREMENT_BUILDERS: Dict[str, Callable[[], RegionalRequirementRecord]] = {
     # EU MRV
-    {
-        "requirement_type": "Emissions Monitoring",
-        "requirement_name": "EU MRV",
-        "full_name": "EU Monitoring, Reporting and Verification of CO2 Emissions from Maritime Transport",
-        "region": "European Union / EEA",
-        "content": """
+    "EU MRV": lambda: RegionalRequirementRecord(
+        requirement_type="Emissions Monitoring",
+        requirement_name="EU MRV",
+        full_name="EU Monitoring, Reporting and Verification of CO2 Emissions from Maritime Transport",
+        region="European Union / EEA",
+        content="""
 EU MRV Regulation (EU) 2015/757 as amended by Regulation (EU) 2023/957
 
 Scope (from 1 January 2024):
@@ -1202,18 +1681,18 @@ Integration with EU ETS (from 1 January 2024):
 - 70% in 2025
 - 100% from 2026
         """,
-        "source": "EU Regulation 2015/757, 2023/957",
-        "last_updated": "2024-01-01",
-        "applicability": "Ships ≥5000 GT calling at EU/EEA ports",
-        "required_documents": ["Monitoring Plan", "Annual Emissions Report", "Document of Compliance"]
-    },
+        source="EU Regulation 2015/757, 2023/957",
+        last_updated=_UPDATED_2024_01_01,
+        applicability="Ships ≥5000 GT calling at EU/EEA ports",
+        required_documents=("Monitoring Plan", "Annual Emissions Report", "Document of Compliance")
+    ),
     # EU ETS Maritime
-    {
-        "requirement_type": "Emissions Trading",
-        "requirement_name": "EU ETS Maritime",
-        "full_name": "EU Emissions Trading System - Maritime Transport",
-        "region": "European Union",
-        "content": """
+    "EU ETS Maritime": lambda: RegionalRequirementRecord(
+        requirement_type="Emissions Trading",
+        requirement_name="EU ETS Maritime",
+        full_name="EU Emissions Trading System - Maritime Transport",
+        region="European Union",
+        content="""
 EU ETS Maritime - Directive (EU) 2023/959
 
 Scope (from 1 January 2024):
@@ -1253,18 +1732,18 @@ Exemptions:
 - Small islands (certain conditions)
 - Ice-class ships (partial)
         """,
-        "source": "EU Directive 2023/959",
-        "last_updated": "2024-01-01",
-        "applicability": "Ships ≥5000 GT on EU voyages",
-        "required_documents": ["EU ETS Account Registration", "Verified Emissions Report"]
-    },
+        source="EU Directive 2023/959",
+        last_updated=_UPDATED_2024_01_01,
+        applicability="Ships ≥5000 GT on EU voyages",
+        required_documents=("EU ETS Account Registration", "Verified Emissions Report")
+    ),
     # FuelEU Maritime
-    {
-        "requirement_type": "Fuel Standard",
-        "requirement_name": "FuelEU Maritime",
-        "full_name": "Regulation on the use of renewable and low-carbon fuels in maritime transport",
-        "region": "European Union",
-        "content": """
+    "FuelEU Maritime": lambda: RegionalRequirementRecord(
+        requirement_type="Fuel Standard",
+        requirement_name="FuelEU Maritime",
+        full_name="Regulation on the use of renewable and low-carbon fuels in maritime transport",
+        region="European Union",
+        content="""
 FuelEU Maritime Regulation (EU) 2023/1805 - from 1 January 2025
 
 Scope:
@@ -1303,18 +1782,18 @@ FuelEU Document of Compliance:
 - Issued after compliance demonstrated
 - Must be carried on board
         """,
-        "source": "EU Regulation 2023/1805",
-        "last_updated": "2024-01-01",
-        "applicability": "Ships ≥5000 GT calling at EU ports (from 2025)",
-        "required_documents": ["FuelEU Monitoring Plan", "FuelEU Document of Compliance"]
-    },
+        source="EU Regulation 2023/1805",
+        last_updated=_UPDATED_2024_01_01,
+        applicability="Ships ≥5000 GT calling at EU ports (from 2025)",
+        required_documents=("FuelEU Monitoring Plan", "FuelEU Document of Compliance")
+    ),
     # Emission Control Areas
-    {
-        "requirement_type": "Emission Control",
-        "requirement_name": "ECA/SECA",
-        "full_name": "Emission Control Areas / Sulphur Emission Control Areas",
-        "region": "Global",
-        "content": """
+    "ECA/SECA": lambda: RegionalRequirementRecord(
+        requirement_type="Emission Control",
+        requirement_name="ECA/SECA",
+        full_name="Emission Control Areas / Sulphur Emission Control Areas",
+        region="Global",
+        content="""
 Emission Control Areas (ECAs) - MARPOL Annex VI
 
 SULPHUR EMISSION CONTROL AREAS (SECA):
@@ -1375,18 +1854,18 @@ Tier III NOx limits apply to ships constructed on/after specified dates:
 - Baltic Sea/North Sea: 1 January 2021
 - Mediterranean: 1 January 2026 (expected)
         """,
-        "source": "MARPOL Annex VI",
-        "last_updated": "2024-01-01",
-        "applicability": "All ships in designated ECAs",
-        "required_documents": ["Bunker Delivery Notes", "Fuel Changeover Procedure", "EGCS Documentation (if fitted)"]
-    },
+        source="MARPOL Annex VI",
+        last_updated=_UPDATED_2024_01_01,
+        applicability="All ships in designated ECAs",
+        required_documents=("Bunker Delivery Notes", "Fuel Changeover Procedure", "EGCS Documentation (if fitted)")
+    ),
     # China Domestic ECA
-    {
-        "requirement_type": "Emission Control",
-        "requirement_name": "China DECA",
-        "full_name": "China Domestic Emission Control Areas",
-        "region": "China",
-        "content": """
+    "China DECA": lambda: RegionalRequirementRecord(
+        requirement_type="Emission Control",
+        requirement_name="China DECA",
+        full_name="China Domestic Emission Control Areas",
+        region="China",
+        content="""
 China Domestic Emission Control Areas (DECA)
 
 Scope:
@@ -1420,12 +1899,31 @@ Documentation Required:
 - Fuel changeover log
 - Evidence of compliant fuel on board for entire port stay
         """,
-        "source": "China Ministry of Transport",
-        "last_updated": "2024-01-01",
-        "applicability": "All ships in Chinese DECA waters",
-        "required_documents": ["Bunker Delivery Notes", "Fuel Changeover Records"]
-    },
-]
+        source="China Ministry of Transport",
+        last_updated=_UPDATED_2024_01_01,
+        applicability="All ships in Chinese DECA waters",
+        required_documents=("Bunker Delivery Notes", "Fuel Changeover Records")
+    ),
+}
+
+
+@lru_cache(maxsize=None)
+def get_regional_requirement(name: str) -> Optional[RegionalRequirementRecord]:
+    """Regional requirement by name, e.g. get_regional_requirement("EU MRV").
+
+    Only the requested record is constructed; it is cached for later calls.
+    """
+    builder = _REGIONAL_REQUIREMENT_BUILDERS.get(name)
+    return builder() if builder is not None else None
+
+
+@lru_cache(maxsize=1)
+def _regional_requirements_data() -> Tuple[RegionalRequirementRecord, ...]:
+    return tuple(get_regional_requirement(name) for name in _REGIONAL_REQUIREMENT_BUILDERS)
+
+
+# REGIONAL_REQUIREMENTS_DATA: every record, built on first access
+_LAZY_ATTRIBUTES["REGIONAL_REQUIREMENTS_DATA"] = _regional_requirements_data
 
 
 # =============================================================================
@@ -1496,9 +1994,9 @@ Penalties:
 - Denial of port entry
         """,
         "source": "33 CFR Part 160, USCG",
-        "last_updated": "2024-01-01",
+        "last_updated": _UPDATED_2024_01_01,
         "applicability": "All vessels entering US waters",
-        "required_documents": ["Electronic NOA submission", "Crew List", "Passenger List", "Cargo Manifest"]
+        "required_documents": ("Electronic NOA submission", "Crew List", "Passenger List", "Cargo Manifest")
     },
     # EU FAL Requirements
     {
@@ -1559,9 +2057,9 @@ Until EMSWe fully operational, submit via national systems:
 - Port community systems
         """,
         "source": "EU Directive 2010/65/EU, EMSWe Regulation",
-        "last_updated": "2024-01-01",
+        "last_updated": _UPDATED_2024_01_01,
         "applicability": "All ships calling at EU ports",
-        "required_documents": ["FAL Forms 1-7", "Pre-arrival notification", "Waste notification"]
+        "required_documents": ("FAL Forms 1-7", "Pre-arrival notification", "Waste notification")
     },
     # IMO FAL Convention
     {
@@ -1612,9 +2110,9 @@ Certificates and Documents to be Carried:
 - May include 50+ documents depending on ship type and trade
         """,
         "source": "IMO FAL Convention",
-        "last_updated": "2024-01-01",
+        "last_updated": _UPDATED_2024_01_01,
         "applicability": "All ships engaged in international voyages",
-        "required_documents": ["FAL Forms 1-7", "Maritime Declaration of Health", "Various certificates per IMO circular"]
+        "required_documents": ("FAL Forms 1-7", "Maritime Declaration of Health", "Various certificates per IMO circular")
     },
     # Customs Documentation General
     {
@@ -1692,9 +2190,9 @@ AEO (Authorized Economic Operator):
 - Mutual recognition between countries
         """,
         "source": "WCO, National Customs Authorities",
-        "last_updated": "2024-01-01",
+        "last_updated": _UPDATED_2024_01_01,
         "applicability": "All ships with cargo",
-        "required_documents": ["Cargo Manifest", "Bills of Lading", "Commercial Invoice", "Customs Entry Forms"]
+        "required_documents": ("Cargo Manifest", "Bills of Lading", "Commercial Invoice", "Customs Entry Forms")
     },
     # Complete Ship Certificate List
     {
@@ -1796,9 +2294,9 @@ Validity Periods:
 - Some documents: No expiry (kept current)
         """,
         "source": "IMO FAL.2/Circ.133",
-        "last_updated": "2024-01-01",
+        "last_updated": _UPDATED_2024_01_01,
         "applicability": "All ships on international voyages",
-        "required_documents": ["All certificates listed above based on ship type"]
+        "required_documents": ("All certificates listed above based on ship type",)
     },
 ]
 
@@ -1807,11 +2305,29 @@ Validity Periods:
 # HELPER FUNCTIONS
 # =============================================================================
 
-def create_documents_for_collection(data_list: List[Dict[str, Any]], collection_name: str) -> List[Document]:
-    """Convert data dictionaries to LangChain Documents with appropriate metadata."""
+def _record_fields(record: Any) -> Dict[str, Any]:
+    """Set fields of a record as a dict; unset optional fields are left out."""
+    values = {}
+    for f in fields(record):
+        # Derived and behavioral fields (parsed, required, applicability_rule) are
+        # declared compare=False and are not part of the stored metadata
+        if not f.compare:
+            continue
+        value = getattr(record, f.name)
+        if value in (None, ()):
+            continue
+        values[f.name] = value.value if isinstance(value, Enum) else value
+    return values
+
+
+def create_documents_for_collection(data_list: List[Any], collection_name: str) -> List[Document]:
+    """Convert data dictionaries or records to LangChain Documents with appropriate metadata."""
     documents = []
 
     for item in data_list:
+        if is_dataclass(item):
+            item = _record_fields(item)
+
         # Build content from the main content field
         content = item.get("content", "")
 
@@ -1824,7 +2340,7 @@ def create_documents_for_collection(data_list: List[Dict[str, Any]], collection_
         # Add all other fields as metadata
         for key, value in item.items():
             if key != "content":
-                if isinstance(value, list):
+                if isinstance(value, (list, tuple)):
                     metadata[key] = json.dumps(value)
                 else:
                     metadata[key] = str(value)
@@ -1846,7 +2362,10 @@ def main():
 
     # Initialize knowledge base
     logger.info("\nInitializing knowledge base...")
-    kb = get_maritime_knowledge_base()
+    # Serve unchanged records from the persistent embedding cache
+    embedding_cache = EmbeddingCache()
+    cached_embeddings = CachedEmbeddings(create_gemini_embeddings(), embedding_cache)
+    kb = MaritimeKnowledgeBase(embeddings=cached_embeddings)
 
     if kb.embeddings is None:
         logger.error("Embeddings not initialized. Check your Google API key.")
@@ -1858,43 +2377,32 @@ def main():
     for name, count in stats.items():
         logger.info(f"  {name}: {count} documents")
 
-    total_added = 0
+    datasets = [
+        ("IMO Conventions", IMO_CONVENTIONS_DATA, "imo_conventions"),
+        ("Port State Control", PSC_REQUIREMENTS_DATA, "psc_requirements"),
+        ("Regional Requirements", _regional_requirements_data(), "regional_requirements"),
+        ("Customs and Documentation", CUSTOMS_DOCUMENTATION_DATA, "customs_documentation"),
+    ]
+
+    documents_by_collection: Dict[str, List[Document]] = {}
+    for label, data, collection_name in datasets:
+        logger.info(f"Building {label} documents...")
+        documents_by_collection[collection_name] = create_documents_for_collection(data, collection_name)
+        logger.info(f"  Created {len(documents_by_collection[collection_name])} documents")
+
+    # Embed every record in one batched request; the per-collection adds
+    # below are then served from the embedding cache
+    cached_embeddings.embed_documents([
+        doc.page_content for docs in documents_by_collection.values() for doc in docs
+    ])
 
-    # Load IMO Conventions
-    logger.info("\n" + "-" * 50)
-    logger.info("Loading IMO Conventions data...")
-    imo_docs = create_documents_for_collection(IMO_CONVENTIONS_DATA, "imo_conventions")
-    logger.info(f"  Created {len(imo_docs)} documents")
-    added = kb.add_documents("imo_conventions", imo_docs)
-    logger.info(f"  Added {added} documents to imo_conventions")
-    total_added += added
-
-    # Load PSC Requirements
-    logger.info("\n" + "-" * 50)
-    logger.info("Loading Port State Control data...")
-    psc_docs = create_documents_for_collection(PSC_REQUIREMENTS_DATA, "psc_requirements")
-    logger.info(f"  Created {len(psc_docs)} documents")
-    added = kb.add_documents("psc_requirements", psc_docs)
-    logger.info(f"  Added {added} documents to psc_requirements")
-    total_added += added
-
-    # Load Regional Requirements
-    logger.info("\n" + "-" * 50)
-    logger.info("Loading Regional Requirements data...")
-    regional_docs = create_documents_for_collection(REGIONAL_REQUIREMENTS_DATA, "regional_requirements")
-    logger.info(f"  Created {len(regional_docs)} documents")
-    added = kb.add_documents("regional_requirements", regional_docs)
-    logger.info(f"  Added {added} documents to regional_requirements")
-    total_added += added
-
-    # Load Customs Documentation
-    logger.info("\n" + "-" * 50)
-    logger.info("Loading Customs and Documentation data...")
-    customs_docs = create_documents_for_collection(CUSTOMS_DOCUMENTATION_DATA, "customs_documentation")
-    logger.info(f"  Created {len(customs_docs)} documents")
-    added = kb.add_documents("customs_documentation", customs_docs)
-    logger.info(f"  Added {added} documents to customs_documentation")
-    total_added += added
+    total_added = 0
+    for label, _, collection_name in datasets:
+        logger.info("\n" + "-" * 50)
+        logger.info(f"Loading {label} data...")
+        added = kb.add_documents(collection_name, documents_by_collection[collection_name])
+        logger.info(f"  Added {added} documents to {collection_name}")
+        total_added += added
 
     # Final summary
     logger.info("\n" + "=" * 70)
@@ -1918,13 +2426,15 @@ def main():
     logger.info(f"  PSC Requirements: {len(PSC_REQUIREMENTS_DATA)} entries")
     logger.info("    - Paris MOU, Tokyo MOU, USCG, Indian Ocean MOU")
     logger.info("    - Common inspection checklist")
-    logger.info(f"  Regional Requirements: {len(REGIONAL_REQUIREMENTS_DATA)} entries")
+    logger.info(f"  Regional Requirements: {len(_regional_requirements_data())} entries")
     logger.info("    - EU MRV, EU ETS, FuelEU Maritime")
     logger.info("    - ECA/SECA zones, China DECA")
     logger.info(f"  Customs Documentation: {len(CUSTOMS_DOCUMENTATION_DATA)} entries")
     logger.info("    - US NOA, EU FAL, IMO FAL Convention")
     logger.info("    - Complete certificate list")
 
+    embedding_cache.close()
+
 
 if __name__ == "__main__":
     main()
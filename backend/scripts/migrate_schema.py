@@ -0,0 +1,176 @@
+"""
+Bring an existing PostgreSQL database in line with the current models
+Run with: python scripts/migrate_schema.py [--source-timezone Asia/Shanghai]
+
+Base.metadata.create_all only creates missing tables; it never changes
+the columns or indexes of tables that already exist. Each step below
+checks the live schema first, so the script is safe to re-run. All steps
+run in one transaction.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import logging
+from typing import Dict, Optional
+
+from sqlalchemy import JSON, DateTime, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateColumn
+from database import engine, Base
+import models  # noqa: F401  registers the tables on Base.metadata
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _column_types(conn: Connection, table: str) -> Dict[str, str]:
+    """Column name -> information_schema data_type for a table."""
+    rows = conn.execute(
+        text(
+            "SELECT column_name, data_type FROM information_schema.columns"
+            " WHERE table_schema = current_schema() AND table_name = :table"
+        ),
+        {"table": table},
+    )
+    return dict(rows.all())
+
+
+def migrate_json_columns(conn: Connection) -> None:
+    """Convert JSON columns still stored as JSON-encoded text to jsonb."""
+    for table in Base.metadata.sorted_tables:
+        current = _column_types(conn, table.name)
+        for column in table.columns:
+            if isinstance(column.type, JSON) and current.get(column.name) == "text":
+                logger.info(f"  {table.name}.{column.name}: text -> jsonb")
+                conn.execute(text(
+                    f"ALTER TABLE {table.name} ALTER COLUMN {column.name}"
+                    f" TYPE jsonb USING NULLIF({column.name}, '')::jsonb"
+                ))
+
+
+def migrate_generated_columns(conn: Connection) -> None:
+    """Re-create plain columns that the models now declare as generated.
+
+    Postgres fills a stored generated column for every existing row when
+    it is added, so this also backfills them.
+    """
+    for table in Base.metadata.sorted_tables:
+        computed = [column for column in table.columns if column.computed is not None]
+        if not computed:
+            continue
+        rows = conn.execute(
+            text(
+                "SELECT column_name FROM information_schema.columns"
+                " WHERE table_schema = current_schema() AND table_name = :table"
+                " AND is_generated = 'NEVER'"
+            ),
+            {"table": table.name},
+        )
+        plain = {name for (name,) in rows}
+        for column in computed:
+            if column.name in plain:
+                ddl = CreateColumn(column).compile(dialect=conn.dialect)
+                logger.info(f"  {table.name}.{column.name}: plain -> {ddl}")
+                conn.execute(text(
+                    f"ALTER TABLE {table.name} DROP COLUMN {column.name}, ADD COLUMN {ddl}"
+                ))
+
+
+def migrate_timestamp_columns(conn: Connection, source_timezone: Optional[str] = None) -> None:
+    """Convert naive timestamp columns to timestamptz.
+
+    Existing values are interpreted as local time in source_timezone,
+    defaulting to the database session TimeZone that server_default
+    now() wrote them in. Pass the API host's zone instead if it differs,
+    since main.py used to write naive datetime.now() values.
+    """
+    if source_timezone:
+        # Transaction-local; ALTER ... USING can't take bind parameters
+        conn.execute(text("SELECT set_config('TimeZone', :tz, true)"), {"tz": source_timezone})
+    for table in Base.metadata.sorted_tables:
+        current = _column_types(conn, table.name)
+        for column in table.columns:
+            if (
+                isinstance(column.type, DateTime)
+                and column.type.timezone
+                and current.get(column.name) == "timestamp without time zone"
+            ):
+                logger.info(f"  {table.name}.{column.name}: timestamp -> timestamptz")
+                conn.execute(text(
+                    f"ALTER TABLE {table.name} ALTER COLUMN {column.name}"
+                    f" TYPE timestamptz USING {column.name} AT TIME ZONE current_setting('TimeZone')"
+                ))
+
+
+def migrate_server_defaults(conn: Connection) -> None:
+    """Add server defaults (e.g. now() on created_at) the live columns lack."""
+    for table in Base.metadata.sorted_tables:
+        with_default = [column for column in table.columns if column.server_default is not None]
+        if not with_default:
+            continue
+        rows = conn.execute(
+            text(
+                "SELECT column_name FROM information_schema.columns"
+                " WHERE table_schema = current_schema() AND table_name = :table"
+                " AND column_default IS NULL"
+            ),
+            {"table": table.name},
+        )
+        missing = {name for (name,) in rows}
+        for column in with_default:
+            if column.name in missing:
+                default = column.server_default.arg
+                if isinstance(default, str):
+                    expression = "'" + default.replace("'", "''") + "'"
+                else:
+                    expression = str(default.compile(dialect=conn.dialect))
+                logger.info(f"  {table.name}.{column.name}: SET DEFAULT {expression}")
+                conn.execute(text(
+                    f"ALTER TABLE {table.name} ALTER COLUMN {column.name} SET DEFAULT {expression}"
+                ))
+
+
+def create_missing_indexes(conn: Connection) -> None:
+    """Create indexes declared on the models that existing tables lack."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate an existing database to the current models")
+    parser.add_argument(
+        "--source-timezone",
+        type=str,
+        default=None,
+        help="Time zone naive timestamps were written in (default: the database session TimeZone)"
+    )
+
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        logger.info(f"Database dialect is {engine.dialect.name}, not PostgreSQL; nothing to migrate")
+        return
+
+    # Tables that don't exist yet are created with the current schema
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as conn:
+        logger.info("Migrating JSON columns...")
+        migrate_json_columns(conn)
+        # Generated columns read from the jsonb columns, so this runs after them
+        logger.info("Migrating generated columns...")
+        migrate_generated_columns(conn)
+        logger.info("Migrating timestamp columns...")
+        migrate_timestamp_columns(conn, args.source_timezone)
+        logger.info("Migrating server defaults...")
+        migrate_server_defaults(conn)
+        logger.info("Creating missing indexes...")
+        create_missing_indexes(conn)
+    logger.info("Schema migration complete!")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from database import SessionLocal, engine, Base
 from models import Port, PSCRegime
@@ -122,34 +123,38 @@ def seed_ports(db: Session):
     """Seed port data into database"""
     print(f"Seeding {len(PORTS_DATA)} ports...")
 
+    # One query for the codes already present instead of one per port
+    existing_codes = {code for (code,) in db.query(Port.un_locode)}
+
+    rows = []
     for port_data in PORTS_DATA:
-        # Check if port already exists
-        existing = db.query(Port).filter(Port.un_locode == port_data["un_locode"]).first()
-        if existing:
+        if port_data["un_locode"] in existing_codes:
             print(f"  Port {port_data['un_locode']} already exists, skipping")
             continue
 
-        port = Port(
-            name=port_data["name"],
-            un_locode=port_data["un_locode"],
-            country=port_data["country"],
-            country_code=port_data["country_code"],
-            region=port_data["region"],
-            longitude=port_data["coordinates"][0],
-            latitude=port_data["coordinates"][1],
-            psc_regime=port_data["psc_regime"],
-            is_eca=port_data["is_eca"],
-        )
-        db.add(port)
-        print(f"  Added port: {port_data['name']} ({port_data['un_locode']})")
-
+        rows.append({
+            "name": port_data["name"],
+            "un_locode": port_data["un_locode"],
+            "country": port_data["country"],
+            "country_code": port_data["country_code"],
+            "region": port_data["region"],
+            "longitude": port_data["coordinates"][0],
+            "latitude": port_data["coordinates"][1],
+            "psc_regime": port_data["psc_regime"],
+            "is_eca": port_data["is_eca"],
+        })
+        print(f"  Adding port: {port_data['name']} ({port_data['un_locode']})")
+
+    # Single executemany INSERT for all new ports
+    if rows:
+        db.execute(insert(Port), rows)
     db.commit()
-    print("Port seeding complete!")
+    print(f"Port seeding complete! ({len(rows)} added)")
 
 
 def main():
-    # Create tables if they don't exist
-    Base.metadata.create_all(bind=engine)
+    # Create the ports table if it doesn't exist (only table this script touches)
+    Base.metadata.create_all(bind=engine, tables=[Port.__table__])
 
     db = SessionLocal()
     try:
@@ -147,12 +147,6 @@ class ComplianceReportGenerator:
             document_analysis, route_compliance, risk_assessments, route_ports
         )
 
-        # Categorize actions by priority
-        critical_actions = [a for a in all_actions if a.priority == Priority.CRITICAL]
-        high_actions = [a for a in all_actions if a.priority == Priority.HIGH]
-        medium_actions = [a for a in all_actions if a.priority == Priority.MEDIUM]
-        low_actions = [a for a in all_actions if a.priority == Priority.LOW]
-
         # Generate summary
         summary = self._generate_summary(
             document_analysis, risk_assessments, all_actions
@@ -164,7 +158,9 @@ class ComplianceReportGenerator:
         # Generate compliance timeline
         timeline = self._generate_timeline(all_actions, voyage_start_date)
 
-        return ComplianceReport(
+        # Every nested part was built (and validated) above as a model instance,
+        # so skip re-validating the whole tree when assembling the report.
+        return ComplianceReport.model_construct(
             report_id=report_id,
             generated_at=datetime.now(),
             valid_until=datetime.now() + timedelta(days=30),
@@ -179,10 +175,7 @@ class ComplianceReportGenerator:
             port_specific_requirements=port_specific,
             risk_assessments=risk_assessments,
             detention_risk=detention_risk,
-            critical_actions=critical_actions,
-            high_priority_actions=high_actions,
-            medium_priority_actions=medium_actions,
-            low_priority_actions=low_actions,
+            actions=all_actions,
             compliance_timeline=timeline,
         )
 
@@ -3,12 +3,11 @@ Compliance Service - Route compliance checking
 Integrates with CrewAI for comprehensive compliance analysis
 """
 import logging
-import json
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from dataclasses import dataclass, field, asdict
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
 
 from models import (
     Vessel, Port, ComplianceCheck, ComplianceStatus,
@@ -338,16 +337,16 @@ class ComplianceService:
             customer_id=customer_id,
             vessel_id=result.vessel_id,
             route_name=result.route_name,
-            route_ports=json.dumps(result.route_ports),
+            route_ports=result.route_ports,
             overall_status=result.overall_status,
             compliance_score=result.compliance_score,
-            port_results=json.dumps([p.to_dict() for p in result.port_results]),
-            missing_documents=json.dumps(result.all_missing_documents),
-            recommendations=json.dumps(result.recommendations),
+            port_results=[p.to_dict() for p in result.port_results],
+            missing_documents=result.all_missing_documents,
+            recommendations=result.recommendations,
             summary_report=result.summary_report,
             detailed_report=result.detailed_report,
             crew_run_id=crew_run_id,
-            agent_outputs=json.dumps(agent_outputs) if agent_outputs else None,
+            agent_outputs=agent_outputs or None,
         )
 
         self.db.add(check)
@@ -361,9 +360,22 @@ class ComplianceService:
         vessel_id: int,
         limit: int = 10
     ) -> List[ComplianceCheck]:
-        """Get compliance check history for a vessel"""
+        """Get compliance check history for a vessel
+
+        Only the summary columns are loaded; the large report/JSON columns
+        (port_results, detailed_report, agent_outputs, ...) stay deferred
+        and are fetched only if a caller touches them.
+        """
         return (
             self.db.query(ComplianceCheck)
+            .options(load_only(
+                ComplianceCheck.id,
+                ComplianceCheck.route_name,
+                ComplianceCheck.route_ports,
+                ComplianceCheck.overall_status,
+                ComplianceCheck.compliance_score,
+                ComplianceCheck.created_at,
+            ))
             .filter(ComplianceCheck.vessel_id == vessel_id)
             .order_by(ComplianceCheck.created_at.desc())
             .limit(limit)
@@ -2,14 +2,17 @@
 Maritime Knowledge Base Service - RAG for maritime regulations
 Uses ChromaDB for vector storage with Gemini embeddings
 """
+import asyncio
 import logging
 import json
+import threading
 from typing import List, Optional, Dict, Any
 from dataclasses import dataclass
 from config import get_settings
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain_chroma import Chroma
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from sentence_transformers import CrossEncoder
 
 logger = logging.getLogger(__name__)
@@ -33,6 +36,14 @@ def _debug_log(run_id: str, hypothesis_id: str, location: str, message: str, dat
         pass
 
 
+def create_gemini_embeddings() -> GoogleGenerativeAIEmbeddings:
+    """Gemini embeddings used by the knowledge base collections."""
+    return GoogleGenerativeAIEmbeddings(
+        model="models/gemini-embedding-001",
+        google_api_key=settings.google_api_key
+    )
+
+
 @dataclass
 class SearchResult:
     """Search result with metadata"""
@@ -63,18 +74,21 @@ class MaritimeKnowledgeBase:
         "user_documents": "User-uploaded certificates and permits",
     }
 
-    def __init__(self):
-        """Initialize the Maritime Knowledge Base with Gemini embeddings."""
+    def __init__(self, embeddings: Optional[Embeddings] = None):
+        """
+        Initialize the Maritime Knowledge Base with Gemini embeddings.
+
+        Args:
+            embeddings: Embeddings to use instead of the default Gemini
+                embeddings, e.g. a caching wrapper in the loader scripts
+        """
         self.collections: Dict[str, Chroma] = {}
         self.reranker = None
         self.bm25_indices: Dict[str, Any] = {}
         self.doc_maps: Dict[str, Dict[str, Document]] = {}
         
         # Initialize Gemini embeddings
-        self.embeddings = GoogleGenerativeAIEmbeddings(
-            model="models/gemini-embedding-001",
-            google_api_key=settings.google_api_key
-        )
+        self.embeddings = embeddings if embeddings is not None else create_gemini_embeddings()
         # region agent log
         _debug_log(
             "pre-fix",
@@ -331,6 +345,20 @@ class MaritimeKnowledgeBase:
             logger.error(f"Error adding documents to {collection_name}: {e}")
             return 0
 
+    def has_source_file(self, collection_name: str, source_file: str) -> bool:
+        """Whether a collection already holds chunks from the given source file."""
+        collection = self.collections.get(collection_name)
+        if collection is None:
+            return False
+        try:
+            result = collection._collection.get(
+                where={"source_file": source_file}, limit=1, include=[]
+            )
+            return bool(result["ids"])
+        except Exception as e:
+            logger.error(f"Error checking {source_file} in {collection_name}: {e}")
+            return False
+
     def get_collection_stats(self) -> Dict[str, int]:
         """Get document counts for all collections"""
         stats = {}
@@ -1064,11 +1092,25 @@ class MaritimeKnowledgeBase:
 
 # Singleton instance
 _maritime_kb: Optional[MaritimeKnowledgeBase] = None
+_maritime_kb_lock = threading.Lock()
 
 
 def get_maritime_knowledge_base() -> MaritimeKnowledgeBase:
     """Get MaritimeKnowledgeBase singleton instance"""
     global _maritime_kb
     if _maritime_kb is None:
-        _maritime_kb = MaritimeKnowledgeBase()
+        # Callers arriving while the instance is still being built wait for it
+        # instead of loading a second set of collections and reranker weights
+        with _maritime_kb_lock:
+            if _maritime_kb is None:
+                _maritime_kb = MaritimeKnowledgeBase()
     return _maritime_kb
+
+
+async def prewarm_maritime_knowledge_base() -> None:
+    """Build the knowledge base singleton in a worker thread during app startup"""
+    try:
+        await asyncio.to_thread(get_maritime_knowledge_base)
+        logger.info("Maritime knowledge base prewarmed")
+    except Exception as e:
+        logger.error(f"Maritime knowledge base prewarm failed: {e}")
@@ -35,6 +35,15 @@ def test_demo_start():
     print("✅ REST endpoint test passed")
     return data["demo_id"]
 
+def test_demo_timeline():
+    response = client.get("/api/v2/demo/timeline")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+
+    data = response.json()
+    assert data["t1_black_swan"]["affected_shipments"] == ["SHP-001", "SHP-003"]
+    assert len(data["t0_normal_state"]["shipments"]) == 3
+
 def test_demo_websocket():
     print("Testing WebSocket...")
     # Start a demo session
@@ -0,0 +1,94 @@
+import os
+import random
+import sys
+
+import orjson
+import pytest
+
+# Add backend directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+loader = pytest.importorskip("scripts.load_knowledge_base")
+
+
+def substring_keywords(text_lower):
+    """Reference matcher: plain substring test per keyword."""
+    return {kw for kw in loader._ALL_KEYWORDS if kw in text_lower}
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "no maritime terms here",
+    "seca",                            # "eca" starts inside "seca"
+    "port_state_control inspection",   # "port" is a prefix of a longer keyword
+    "safety management certificate",   # "safety management" is a prefix
+    "isps certificate",                # "isps" is a prefix
+    "mechanism",                       # "ism" inside a word
+    "reporting and transport",         # "port" inside words
+    "solasmarpolstcw",                 # adjacent keywords without separators
+    "eu_mrv/us_cfr/eca_zones",
+])
+def test_find_keywords_matches_substring_scan(text):
+    assert loader._find_keywords(text) == substring_keywords(text)
+
+
+def test_find_keywords_overlapping_keywords():
+    assert loader._find_keywords("seca") == {"seca", "eca"}
+    assert loader._find_keywords("port_state_control") == {"port_state_control", "port"}
+    assert loader._find_keywords("safety management certificate") == {
+        "safety management certificate", "safety management",
+    }
+
+
+def test_find_keywords_substring_semantics_inside_words():
+    # Like the original "kw in text" checks, keywords match inside words
+    assert "ism" in loader._find_keywords("mechanism")
+    assert "port" in loader._find_keywords("transport")
+
+
+def test_find_keywords_randomized_against_substring_scan():
+    rng = random.Random(0)
+    pieces = list(loader._ALL_KEYWORDS) + [" ", "_", "-", "x", "s", "e", "ca", "por", "cert"]
+    for _ in range(2000):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 8)))
+        assert loader._find_keywords(text) == substring_keywords(text)
+
+
+def test_detect_collection_path_takes_priority_over_content():
+    assert loader.detect_collection("data/marpol_annex_vi.pdf", "customs clearance") == "imo_conventions"
+
+
+def test_detect_collection_falls_back_to_content():
+    assert loader.detect_collection("data/a.txt", "Customs clearance procedures") == "customs_documentation"
+
+
+def test_detect_collection_uses_collection_order():
+    # "detention" (psc_requirements) is listed before "port" (port_regulations)
+    assert loader.detect_collection("data/a.txt", "port detention statistics") == "psc_requirements"
+
+
+def test_detect_collection_only_scans_content_prefix():
+    assert loader.detect_collection("data/a.txt", "x" * 2000 + "customs") == "imo_conventions"
+
+
+def test_detect_collection_default():
+    assert loader.detect_collection("data/a.txt", "nothing relevant") == "imo_conventions"
+
+
+def test_extract_metadata_convention_priority():
+    metadata = loader.extract_metadata("data/regs/a.txt", "MARPOL and SOLAS requirements")
+    assert metadata["source_convention"] == "SOLAS"
+    assert metadata["source_file"] == "a.txt"
+    assert metadata["file_path"] == "data/regs/a.txt"
+
+
+def test_extract_metadata_ism_and_isps_markers():
+    assert loader.extract_metadata("a.txt", "Safety Management System")["source_convention"] == "ISM Code"
+    assert loader.extract_metadata("a.txt", "Ship security plan")["source_convention"] == "ISPS Code"
+    assert "source_convention" not in loader.extract_metadata("a.txt", "nothing relevant")
+
+
+def test_extract_metadata_required_documents_sorted():
+    metadata = loader.extract_metadata("a.txt", "Load Line Certificate and IOPP Certificate")
+    assert orjson.loads(metadata["required_documents"]) == ["iopp_certificate", "load_line_certificate"]
+    assert "required_documents" not in loader.extract_metadata("a.txt", "no certificates")
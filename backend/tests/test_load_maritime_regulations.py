@@ -0,0 +1,226 @@
+import os
+import sys
+from datetime import date
+
+import pytest
+
+# Add backend directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+regs = pytest.importorskip("scripts.load_maritime_regulations")
+
+
+def sections(records):
+    return [(record.convention.value, record.section) for record in records]
+
+
+def test_search_conventions_hyphenated_term():
+    assert sections(regs.search_conventions("II-2"))[0] == ("SOLAS", "II-2")
+
+
+def test_search_conventions_apostrophe():
+    assert regs.search_conventions("ship's")
+
+
+@pytest.mark.parametrize("query", ["NOT fire", "AND", "col:x", 'a"b', "(Tier", "NOx*"])
+def test_search_conventions_treats_fts5_syntax_literally(query):
+    assert isinstance(regs.search_conventions(query), list)
+
+
+def test_search_conventions_ranks_best_match_first():
+    assert sections(regs.search_conventions("Tier III NOx"))[0] == ("MARPOL", "VI")
+
+
+def test_search_conventions_empty_query():
+    assert regs.search_conventions("") == []
+    assert regs.search_conventions("   ") == []
+
+
+def test_parse_content_sections_of_real_record():
+    parsed = regs.get_by_chapter("SOLAS", "I").parsed
+    assert list(parsed.sections) == [
+        "Key Requirements",
+        "Certificate Requirements",
+        "Amendments entering force 1 January 2024",
+    ]
+    # Indented continuation lines are folded into the item above them
+    assert parsed.sections["Key Requirements"][1] == (
+        "Surveys: Initial survey before ship enters service, periodic surveys at intervals "
+        "not exceeding 5 years, intermediate surveys, annual surveys, and additional surveys "
+        "as occasion arises"
+    )
+
+
+def test_parse_content_requirements_of_real_record():
+    parsed = regs.get_by_chapter("SOLAS", "I").parsed
+    # Items under both "Key Requirements" and "Certificate Requirements"
+    assert len(parsed.requirements) == 10
+    assert parsed.requirements[-1] == "Exemption Certificate: When exemptions granted under SOLAS"
+
+
+def test_parse_content_dated_updates():
+    parsed = regs.get_by_chapter("SOLAS", "I").parsed
+    assert parsed.updates[0] == (
+        date(2024, 1, 1), "New mooring safety requirements for ships >3000 GT"
+    )
+    assert len(parsed.updates) == 3
+    # A heading starting with a year is dated 1 January of that year
+    (effective, item), = regs.get_by_chapter("SOLAS", "II-2").parsed.updates
+    assert effective == date(2026, 1, 1)
+    assert item.startswith("PFOS ban")
+
+
+def test_parse_content_certificate_validity():
+    parsed = regs.get_by_chapter("SOLAS", "I").parsed
+    assert parsed.certificate_validity == {
+        "Passenger Ship Safety Certificate": "Valid for max 12 months",
+        "Cargo Ship Safety Construction Certificate": "Valid for max 5 years",
+        "Cargo Ship Safety Equipment Certificate": "Valid for max 5 years",
+        "Cargo Ship Safety Radio Certificate": "Valid for max 5 years",
+    }
+    # Numbered items mentioning validity are not certificate bullets
+    assert "Duration and Validity" not in parsed.certificate_validity
+    assert regs.get_by_annex("MARPOL", "I").parsed.certificate_validity == {
+        "International Oil Pollution Prevention (IOPP) Certificate": "Valid 5 years",
+    }
+
+
+def test_parse_content_ignores_text_outside_headings():
+    parsed = regs.parse_content("Intro line\n- stray item\nHeading:\n- kept item\n  continued")
+    assert parsed.sections == {"Heading": ("kept item continued",)}
+    assert parsed.requirements == ()
+    assert parsed.updates == ()
+
+
+def applicable(**particulars):
+    return set(sections(regs.applicable_conventions(regs.ShipContext(**particulars))))
+
+
+def test_applicable_conventions_unknown_particulars_apply():
+    # Only tonnage known: every record applies, including Load Lines
+    result = applicable(gross_tonnage=50000)
+    assert ("Load Line", "General") in result
+    assert result == set(sections(regs.IMO_CONVENTIONS_DATA))
+
+
+def test_applicable_conventions_known_particulars_exclude():
+    result = applicable(
+        gross_tonnage=100,
+        length_m=20,
+        persons_on_board=10,
+        engine_power_kw=100,
+        carries_ballast_water=False,
+        carries_noxious_liquids=False,
+        carries_packaged_dangerous_goods=False,
+    )
+    for excluded in [
+        ("Load Line", "General"),
+        ("MARPOL", "II"),
+        ("MARPOL", "III"),
+        ("MARPOL", "IV"),
+        ("MARPOL", "VI"),
+        ("BWM", "General"),
+    ]:
+        assert excluded not in result
+    assert ("Tonnage", "General") in result
+
+
+@pytest.mark.parametrize("length_m, expected", [(23.9, False), (24, True), (None, True)])
+def test_applicable_conventions_load_line_length_threshold(length_m, expected):
+    assert (("Load Line", "General") in applicable(gross_tonnage=100, length_m=length_m)) is expected
+
+
+@pytest.mark.parametrize("persons_on_board, expected", [(15, False), (16, True), (None, True)])
+def test_applicable_conventions_sewage_persons_threshold(persons_on_board, expected):
+    assert (("MARPOL", "IV") in applicable(gross_tonnage=100, persons_on_board=persons_on_board)) is expected
+
+
+@pytest.mark.parametrize("engine_power_kw, expected", [(130, False), (131, True), (None, True)])
+def test_applicable_conventions_air_pollution_power_threshold(engine_power_kw, expected):
+    assert (("MARPOL", "VI") in applicable(gross_tonnage=100, engine_power_kw=engine_power_kw)) is expected
+
+
+@pytest.mark.parametrize("gross_tonnage, expected", [(299, False), (300, True)])
+def test_applicable_conventions_radio_tonnage_threshold(gross_tonnage, expected):
+    assert (("SOLAS", "IV") in applicable(gross_tonnage=gross_tonnage)) is expected
+
+
+@pytest.mark.parametrize("gross_tonnage, vessel_type, expected", [
+    (499, "container", False),
+    (500, "container", True),
+    (100, "passenger", True),
+])
+def test_applicable_conventions_ism_isps_threshold(gross_tonnage, vessel_type, expected):
+    result = applicable(gross_tonnage=gross_tonnage, vessel_type=vessel_type)
+    assert (("SOLAS", "IX") in result) is expected
+    assert (("SOLAS", "XI-2") in result) is expected
+
+
+@pytest.mark.parametrize("gross_tonnage, vessel_type, expected", [
+    (399, "container", False),
+    (400, "container", True),
+    (149, "tanker", False),
+    (150, "tanker", True),
+])
+def test_applicable_conventions_oil_pollution_threshold(gross_tonnage, vessel_type, expected):
+    assert (("MARPOL", "I") in applicable(gross_tonnage=gross_tonnage, vessel_type=vessel_type)) is expected
+
+
+def test_applicable_conventions_domestic_ship():
+    result = applicable(gross_tonnage=50000, international=False)
+    assert ("SOLAS", "I") not in result
+    assert ("Load Line", "General") not in result
+    assert ("MARPOL", "I") in result
+
+
+def test_gt_thresholds_parsed_from_tonnage_notes():
+    assert [gt for gt, _ in regs.GT_THRESHOLDS] == [300, 400, 500, 3000]
+
+
+@pytest.mark.parametrize("gross_tonnage, expected", [
+    (299, ()),
+    (300, ("AIS", "GMDSS")),
+    (499, ("AIS", "GMDSS", "MARPOL Annex I/IV/V")),
+    (500, ("AIS", "GMDSS", "MARPOL Annex I/IV/V", "ISM", "ISPS")),
+])
+def test_requirements_for_gt_at_thresholds(gross_tonnage, expected):
+    assert regs.requirements_for_gt(gross_tonnage) == expected
+
+
+def test_required_psc_certs_passenger_ship():
+    required = regs.required_psc_certs(regs.ShipContext(gross_tonnage=30000, vessel_type="passenger"))
+    assert regs.PSCCert.PASSENGER_SAFETY in required
+    for cert in (
+        regs.PSCCert.CARGO_SAFETY_CONSTRUCTION,
+        regs.PSCCert.CARGO_SAFETY_EQUIPMENT,
+        regs.PSCCert.CARGO_SAFETY_RADIO,
+    ):
+        assert cert not in required
+
+
+@pytest.mark.parametrize("vessel_type", ["container", "tanker", None])
+def test_required_psc_certs_cargo_ship(vessel_type):
+    required = regs.required_psc_certs(regs.ShipContext(gross_tonnage=30000, vessel_type=vessel_type))
+    assert regs.PSCCert.PASSENGER_SAFETY not in required
+    assert regs.PSCCert.CARGO_SAFETY_CONSTRUCTION in required
+    assert regs.PSCCert.SMC in required
+
+
+@pytest.mark.parametrize("carries_noxious_liquids, expected", [(None, True), (True, True), (False, False)])
+def test_required_psc_certs_nls(carries_noxious_liquids, expected):
+    ship = regs.ShipContext(gross_tonnage=30000, carries_noxious_liquids=carries_noxious_liquids)
+    assert (regs.PSCCert.NLS in regs.required_psc_certs(ship)) is expected
+
+
+def test_missing_psc_certs_from_names():
+    ship = regs.ShipContext(gross_tonnage=30000, vessel_type="container", carries_noxious_liquids=False)
+    held = regs.psc_certs_from_names([
+        "Certificate of Registry",
+        "Safety Management Certificate (SMC)",
+        "Not a certificate",
+    ])
+    missing = regs.missing_psc_certs(ship, held)
+    assert regs.PSCCert.SMC not in missing
+    assert regs.PSCCert.DOC in missing
+    assert missing.bit_count() == regs.required_psc_certs(ship).bit_count() - 2
+    assert not regs.missing_psc_certs(ship, regs.required_psc_certs(ship))